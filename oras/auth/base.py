@@ -24,6 +24,15 @@ class AuthBackend:
     def get_auth_header(self):
         raise NotImplementedError
 
+    def get_request_auth_header(self) -> dict:
+        """
+        Get the auth header to send with a request before the registry asks.
+
+        This is empty until the backend knows it is needed, e.g. after a
+        first challenge, and saves a 401 round trip on every later request.
+        """
+        return {}
+
     def get_container(self, name: container_type) -> oras.container.Container:
         """
         Courtesy function to get a container from a URI.
@@ -3,6 +3,7 @@ __copyright__ = "Copyright The ORAS Authors."
 __license__ = "Apache-2.0"
 
 import os
+from typing import Optional
 
 import requests
 
@@ -18,14 +19,38 @@ class BasicAuth(AuthBackend):
         username = os.environ.get("ORAS_USER")
         password = os.environ.get("ORAS_PASS")
         super().__init__()
+
+        # Credentials are only sent up front once the registry asked for them
+        self._challenged = False
+        self._basic_auth = None
         if username and password:
             self.set_basic_auth(username, password)
 
+    @property
+    def _basic_auth(self) -> Optional[str]:
+        return self._basic_auth_value
+
+    @_basic_auth.setter
+    def _basic_auth(self, basic_auth: Optional[str]):
+        """
+        Set the basic auth, and the header value once for all requests.
+        """
+        self._basic_auth_value = basic_auth
+        self._auth_header = {"Authorization": "Basic %s" % basic_auth}
+
     def _logout(self):
         self._basic_auth = None
 
     def get_auth_header(self):
-        return {"Authorization": "Basic %s" % self._basic_auth}
+        return dict(self._auth_header)
+
+    def get_request_auth_header(self) -> dict:
+        """
+        Send basic auth with every request after the first challenge.
+        """
+        if not self._challenged or not self._basic_auth:
+            return {}
+        return self.get_auth_header()
 
     def authenticate_request(
         self, original: requests.Response, headers: dict, refresh=False
@@ -39,6 +64,7 @@ class BasicAuth(AuthBackend):
         :param originalResponse: original response to get the Www-Authenticate header
         :type originalResponse: requests.Response
         """
+        self._challenged = True
         result = {}
         if headers is not None:
             result.update(headers)
@@ -2,9 +2,15 @@ __author__ = "Vanessa Sochat"
 __copyright__ = "Copyright The ORAS Authors."
 __license__ = "Apache-2.0"
 
+import base64
+import os
+import time
+from typing import Optional
+
 import requests
 
 import oras.auth.utils as auth_utils
+import oras.utils
 from oras.logger import logger
 
 from .base import AuthBackend
@@ -16,9 +22,26 @@ class TokenAuth(AuthBackend):
     """
 
     def __init__(self):
-        self.token = None
+        self._token = None
+        self._bearer = None
+        self.token_expires_in: Optional[int] = None
+
+        # Optionally save tokens to disk, to be used by the next client
+        self.token_cache = os.environ.get("ORAS_TOKEN_CACHE")
         super().__init__()
 
+    @property
+    def token(self) -> Optional[str]:
+        return self._token
+
+    @token.setter
+    def token(self, token: Optional[str]):
+        """
+        Set the token, and the Bearer header value once for all requests.
+        """
+        self._token = token
+        self._bearer = "Bearer %s" % token if token else None
+
     def _logout(self):
         self.token = None
 
@@ -32,7 +55,15 @@ class TokenAuth(AuthBackend):
         self.token = token
 
     def get_auth_header(self):
-        return {"Authorization": "Bearer %s" % self.token}
+        return {"Authorization": self._bearer}
+
+    def get_request_auth_header(self) -> dict:
+        """
+        Send the token with every request once we have one.
+        """
+        if self._token is None:
+            return {}
+        return self.get_auth_header()
 
     def reset_basic_auth(self):
         """
@@ -66,10 +97,22 @@ class TokenAuth(AuthBackend):
 
         # If we have a token, set auth header (base64 encoded user/pass)
         if self.token:
-            headers["Authorization"] = "Bearer %s" % self.token
+            headers["Authorization"] = self._bearer
             return headers, True
 
         h = auth_utils.parse_auth_header(authHeaderRaw)
+        cache_key = self._get_token_cache_key(h)
+
+        # A token from an earlier run that has not expired yet. On a refresh
+        # the cached token is the one that was just rejected, so drop it.
+        if refresh:
+            self.cache_token(cache_key)
+        token = None if refresh else self.get_cached_token(cache_key)
+        if token:
+            logger.debug("Using cached token.")
+            self.token = token
+            headers["Authorization"] = self._bearer
+            return headers, True
 
         # if no basic auth, try by request an anonymous token
         if not hasattr(self, "_basic_auth"):
@@ -77,14 +120,16 @@ class TokenAuth(AuthBackend):
             if anon_token:
                 logger.debug("Successfully obtained anonymous token!")
                 self.token = anon_token
-                headers["Authorization"] = "Bearer %s" % self.token
+                self.cache_token(cache_key)
+                headers["Authorization"] = self._bearer
                 return headers, True
 
         # basic auth is available, try using auth token
         token = self.request_token(h)
         if token:
             self.token = token
-            headers["Authorization"] = "Bearer %s" % self.token
+            self.cache_token(cache_key)
+            headers["Authorization"] = self._bearer
             return headers, True
 
         logger.error(
@@ -133,6 +178,7 @@ class TokenAuth(AuthBackend):
 
         # Request the token
         info = authResponse.json()
+        self.token_expires_in = info.get("expires_in")
         return info.get("token") or info.get("access_token")
 
     def request_anonymous_token(self, h: auth_utils.authHeader) -> bool:
@@ -161,8 +207,79 @@ class TokenAuth(AuthBackend):
         # We can get token OR access_token OR both (when both they are identical)
         data = response.json()
         token = data.get("token") or data.get("access_token")
+        self.token_expires_in = data.get("expires_in")
 
         # Update the headers but not self.token (expects Basic)
         if token:
             return token
         logger.debug("Warning: no token or access_token present in response.")
+
+    def _get_token_cache_key(self, h: auth_utils.authHeader) -> str:
+        """
+        Tokens are cached per realm, service, scope and user name.
+
+        Nothing derived from the password is written to the cache.
+        """
+        user = ""
+        basic_auth = getattr(self, "_basic_auth", None)
+        if basic_auth:
+            try:
+                username = base64.b64decode(basic_auth).decode("utf-8")
+            except ValueError:
+                username = ""
+            user = "user:" + username.split(":", 1)[0]
+        return " ".join([h.realm or "", h.service or "", h.scope or "", user])
+
+    def get_cached_token(self, key: str) -> Optional[str]:
+        """
+        Get a token from the token cache, if enabled and not expired.
+
+        :param key: the token cache key
+        :type key: str
+        """
+        if not self.token_cache:
+            return None
+        try:
+            cache = oras.utils.read_json(self.token_cache)
+        except (OSError, ValueError):
+            return None
+        entry = cache.get(key) or {}
+        if entry.get("expires_at", 0) > time.time():
+            return entry.get("token")
+        return None
+
+    def cache_token(self, key: str):
+        """
+        Save the current token to the token cache, if enabled.
+
+        Without a current token, the cached token for the key is removed.
+        Without an expires_in the token is valid for 60 seconds, and we stop
+        using it a little before it expires.
+
+        :param key: the token cache key
+        :type key: str
+        """
+        if not self.token_cache:
+            return
+
+        now = time.time()
+        expires_at = now + (self.token_expires_in or 60) - 10
+        try:
+            oras.utils.mkdir_p(os.path.dirname(os.path.abspath(self.token_cache)))
+            with oras.utils.lock_file(self.token_cache):
+                try:
+                    cache = oras.utils.read_json(self.token_cache)
+                except (OSError, ValueError):
+                    cache = {}
+
+                # Drop expired tokens while we are here
+                cache = {k: v for k, v in cache.items() if v.get("expires_at", 0) > now}
+                if self.token:
+                    cache[key] = {"token": self.token, "expires_at": expires_at}
+                else:
+                    cache.pop(key, None)
+                oras.utils.write_json_atomic(cache, self.token_cache)
+
+        # Failing to cache a token shouldn't fail the request
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cannot save token to {self.token_cache}: {e}")
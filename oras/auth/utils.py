@@ -3,9 +3,10 @@ __copyright__ = "Copyright The ORAS Authors."
 __license__ = "Apache-2.0"
 
 import base64
+import functools
 import os
 import re
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 import oras.utils
 from oras.logger import logger
@@ -78,9 +79,18 @@ def parse_auth_header(authHeaderRaw: str) -> authHeader:
     :param password: the user account password
     :type password: str
     """
-    regex = re.compile('([a-zA-z]+)="(.+?)"')
-    matches = regex.findall(authHeaderRaw)
-    lookup = dict()
-    for match in matches:
-        lookup[match[0]] = match[1]
-    return authHeader(lookup)
+    return authHeader(dict(_parse_auth_header(authHeaderRaw)))
+
+
+auth_header_regex = re.compile('([a-zA-z]+)="(.+?)"')
+
+
+@functools.lru_cache(maxsize=64)
+def _parse_auth_header(authHeaderRaw: str) -> Tuple[Tuple[str, str], ...]:
+    """
+    Parse the key/value pairs of an authentication header.
+
+    Registries send the same challenge again and again, so the parsed pairs are
+    cached. They are immutable, and each caller gets its own authHeader.
+    """
+    return tuple(auth_header_regex.findall(authHeaderRaw))
@@ -29,11 +29,15 @@ def ensure_container(func):
 def retry(attempts=5, timeout=2):
     """
     A simple retry decorator
+
+    If the request data is a file object, it is rewound before a retry.
     """
 
     def decorator(func):
         @wraps(func)
         def inner(*args, **kwargs):
+            data = kwargs.get("data")
+            position = data.tell() if hasattr(data, "seek") else None
             attempt = 0
             while attempt < attempts:
                 try:
@@ -55,6 +59,8 @@ def retry(attempts=5, timeout=2):
                     logger.info(f"Retrying in {sleep} seconds - error: {e}")
                     time.sleep(sleep)
                     attempt += 1
+                    if position is not None:
+                        data.seek(position)
             return func(*args, **kwargs)
 
         return inner
@@ -41,6 +41,33 @@ default_blocksize = 32768
 # DefaultChunkSize default size of each chunk when uploading chunked blobs.
 default_chunksize = 16777216  # 16MB
 
+# MinChunkSize smallest chunk to fall back to when a registry rejects a chunk as too large.
+min_chunksize = 1048576  # 1MB
+
+# Connection pools kept by the session (one per host) and connections per pool
+default_pool_connections = 16
+default_pool_maxsize = 64
+
+# Maximum number of blobs uploaded (or downloaded) at once
+default_max_workers = 8
+
+# Files larger than this (64MB) are memory mapped for hashing on 64-bit platforms
+mmap_hash_threshold = 67108864
+
+# Files larger than this (16MB) are memory mapped for upload on 64-bit platforms
+mmap_upload_threshold = 16777216
+
+# Blobs larger than this (64MB) are downloaded in parallel ranges of the chunk size
+parallel_download_size = 67108864
+
+# Retries of these responses, done by urllib3. A 429 (too many requests) waits
+# as long as its Retry-After header asks, up to max_retry_after seconds.
+# Connection errors (and a 500) are retried by oras.decorator.retry instead,
+# so a request is sent at most 1 + default_max_retries times for a response.
+default_max_retries = 3
+default_retry_statuses = (429, 502, 503, 504)
+max_retry_after = 60
+
 # what you get for a blank digest, so we don't need to save and recalculate
 blank_hash = "sha256:e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855"
 
@@ -35,18 +35,16 @@ class DockerClient:
         """
         if not dockercfg_path:
             dockercfg_path = oras.utils.find_docker_config(exists=False)
-        if os.path.exists(dockercfg_path):  # type: ignore
-            cfg = oras.utils.read_json(dockercfg_path)  # type: ignore
-        else:
-            oras.utils.mkdir_p(os.path.dirname(dockercfg_path))  # type: ignore
-            cfg = {"auths": {}}
-        if registry in cfg["auths"]:
-            cfg["auths"][registry]["auth"] = auth_utils.get_basic_auth(
-                username, password
-            )
-        else:
-            cfg["auths"][registry] = {
-                "auth": auth_utils.get_basic_auth(username, password)
-            }
-        oras.utils.write_json(cfg, dockercfg_path)  # type: ignore
+        dockercfg_dir = os.path.dirname(dockercfg_path)  # type: ignore
+        if dockercfg_dir:
+            oras.utils.mkdir_p(dockercfg_dir)
+
+        with oras.utils.lock_file(dockercfg_path):  # type: ignore
+            try:
+                cfg = oras.utils.read_json(dockercfg_path)  # type: ignore
+            except FileNotFoundError:
+                cfg = {"auths": {}}
+            auth = auth_utils.get_basic_auth(username, password)
+            cfg["auths"].setdefault(registry, {})["auth"] = auth
+            oras.utils.write_json_atomic(cfg, dockercfg_path)  # type: ignore
         return {"Status": "Login Succeeded"}
@@ -2,12 +2,12 @@ __author__ = "Vanessa Sochat"
 __copyright__ = "Copyright The ORAS Authors."
 __license__ = "Apache-2.0"
 
-import copy
 import hashlib
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 
 import jsonschema
 
@@ -15,13 +15,54 @@ import oras.defaults
 import oras.schemas
 import oras.utils
 
-EmptyManifest = {
-    "schemaVersion": 2,
-    "mediaType": oras.defaults.default_manifest_media_type,
-    "config": {},
-    "layers": [],
-    "annotations": {},
-}
+
+def NewManifest() -> dict:
+    """
+    Get an empty manifest config.
+
+    A literal is returned (instead of a deep copy of EmptyManifest) so each
+    call gets fresh containers without the cost of copy.deepcopy, which is
+    also faster than loading a serialized template.
+    """
+    return {
+        "schemaVersion": 2,
+        "mediaType": oras.defaults.default_manifest_media_type,
+        "config": {},
+        "layers": [],
+        "annotations": {},
+    }
+
+
+# Kept for reference and backwards compatibility, NewManifest is the source of truth
+EmptyManifest = NewManifest()
+
+# Compile the layer and manifest schemas once instead of on every jsonschema.validate call
+_layer_validator = jsonschema.Draft7Validator(oras.schemas.layer)
+_manifest_validator = jsonschema.Draft7Validator(oras.schemas.manifest)
+
+# Layers and configs are built here (not by users), so checking them against
+# the schema is a debugging aid. Export ORAS_VALIDATE=1 to enable it.
+validate_layers = os.environ.get("ORAS_VALIDATE") == "1"
+
+
+def _validate_layer(layer: dict):
+    """
+    Validate a layer (or config) against the layer schema, if enabled.
+    """
+    if validate_layers:
+        _layer_validator.validate(layer)
+
+
+def validate_manifest(manifest: dict):
+    """
+    Validate a manifest against the manifest schema.
+
+    This is always done, as manifests come from users and registries.
+
+    :param manifest: the manifest to validate
+    :type manifest: dict
+    """
+    _manifest_validator.validate(manifest)
 
 
 class Annotations:
@@ -31,6 +72,7 @@ class Annotations:
 
     def __init__(self, filename=None):
         self.lookup = {}
+        self.has_abspaths = False
         self.load(filename)
 
     def add(self, section, key, value):
@@ -39,25 +81,34 @@ class Annotations:
         """
         if section not in self.lookup:
             self.lookup[section] = {}
+            self.has_abspaths = self.has_abspaths or os.path.isabs(section)
         self.lookup[section][key] = value
 
     def load(self, filename: str):
-        if filename and os.path.exists(filename):
+        if not filename:
+            return
+        try:
             self.lookup = oras.utils.read_json(filename)
-        if filename and not os.path.exists(filename):
+        except FileNotFoundError:
             raise FileNotFoundError(f"Annotation file {filename} does not exist.")
+        self.has_abspaths = any(os.path.isabs(section) for section in self.lookup)
 
     def get_annotations(self, section: str) -> dict:
         """
         Given the name (a relative path or named section) get annotations
         """
-        for name in section, os.path.abspath(section):
-            if name in self.lookup:
-                return self.lookup[name]
-        return {}
+        # Only resolve the absolute path (a getcwd call) if there isn't a direct
+        # hit and there are absolute paths to match
+        if section in self.lookup:
+            return self.lookup[section]
+        if not self.has_abspaths:
+            return {}
+        return self.lookup.get(os.path.abspath(section)) or {}
 
 
 class Layer:
+    __slots__ = ("blob_path", "media_type")
+
     def __init__(
         self, blob_path: str, media_type: Optional[str] = None, is_dir: bool = False
     ):
@@ -93,12 +144,13 @@ class Layer:
         """
         Return a dictionary representation of the layer
         """
+        size, digest = oras.utils.get_size_and_hash(self.blob_path)
         layer = {
             "mediaType": self.media_type,
-            "size": oras.utils.get_size(self.blob_path),
-            "digest": "sha256:" + oras.utils.get_file_hash(self.blob_path),
+            "size": size,
+            "digest": "sha256:" + digest,
         }
-        jsonschema.validate(layer, schema=oras.schemas.layer)
+        _validate_layer(layer)
         return layer
 
 
@@ -118,6 +170,53 @@ def NewLayer(
     return Layer(blob_path=blob_path, media_type=media_type, is_dir=is_dir).to_dict()
 
 
+def NewLayers(
+    blob_paths: List[str],
+    media_types: Optional[List[Optional[str]]] = None,
+    is_dirs: Optional[List[bool]] = None,
+    max_workers: Optional[int] = None,
+) -> List[dict]:
+    """
+    Courtesy function to create and retrieve many layers as dicts.
+
+    Sizes and digests are computed in parallel across blobs (hashing releases
+    the GIL) and layers are only materialized as dicts once everything is known.
+    The returned layers are in the same order as the blob paths.
+
+    :param blob_paths: the paths of the blobs for the layers
+    :type blob_paths: list
+    :param media_types: media types for the blobs (optional)
+    :type media_types: list
+    :param is_dirs: is each blob a directory? (optional)
+    :type is_dirs: list
+    :param max_workers: maximum number of threads to use (optional)
+    :type max_workers: int
+    """
+    count = len(blob_paths)
+    media_types = media_types or [None] * count
+    is_dirs = is_dirs or [False] * count
+    if len(media_types) != count or len(is_dirs) != count:
+        raise ValueError("media_types and is_dirs must match the number of blobs.")
+
+    # Hashing is bound by cpu (and then disk), more threads than cores won't help
+    max_workers = max_workers or min(8, os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        hashed = list(executor.map(oras.utils.get_size_and_hash, blob_paths))
+
+    layers = []
+    for blob_path, media_type, is_dir, (size, digest) in zip(
+        blob_paths, media_types, is_dirs, hashed
+    ):
+        layer = {
+            "mediaType": Layer(blob_path, media_type, is_dir).media_type,
+            "size": size,
+            "digest": "sha256:" + digest,
+        }
+        _validate_layer(layer)
+        layers.append(layer)
+    return layers
+
+
 def ManifestConfig(
     path: Optional[str] = None, media_type: Optional[str] = None
 ) -> Tuple[Dict[str, object], Optional[str]]:
@@ -129,8 +228,16 @@ def ManifestConfig(
     :param media_type: media type for the manifest config (optional)
     :type media_type: str
     """
+    # A single stat tells us if the config exists and gives us the size
+    st = None
+    if path:
+        try:
+            st = os.stat(path)
+        except OSError:
+            pass
+
     # Create an empty config if we don't have one
-    if not path or not os.path.exists(path):
+    if st is None:
         path = None
         conf = {
             "mediaType": media_type or oras.defaults.unknown_config_media_type,
@@ -141,36 +248,62 @@ def ManifestConfig(
     else:
         conf = {
             "mediaType": media_type or oras.defaults.unknown_config_media_type,
-            "size": oras.utils.get_size(path),
-            "digest": "sha256:" + oras.utils.get_file_hash(path),
+            "size": st.st_size,
+            "digest": "sha256:" + oras.utils.get_file_hash(path),  # type: ignore
         }
 
-    jsonschema.validate(conf, schema=oras.schemas.layer)
+    _validate_layer(conf)
     return conf, path
 
 
-def NewManifest() -> dict:
+def serialize_manifest(manifest: dict) -> bytes:
     """
-    Get an empty manifest config.
+    Serialize a manifest to the bytes that are pushed (and hashed).
+
+    The default json format is used, and not a faster or more compact one,
+    so the digests of manifests stay the same across versions.
+
+    :param manifest: the manifest to serialize
+    :type manifest: dict
     """
-    return copy.deepcopy(EmptyManifest)
+    return json.dumps(manifest).encode("utf-8")
+
+
+def content_digest(content: bytes) -> str:
+    """
+    Get the sha256 digest of some content, e.g., a serialized manifest.
+
+    :param content: the content to hash
+    :type content: bytes
+    """
+    return "sha256:" + hashlib.sha256(content).hexdigest()
 
 
 @dataclass
 class Subject:
+    # Declared by hand (instead of slots=True) to support Python < 3.10
+    __slots__ = ("mediaType", "digest", "size")
+
     mediaType: str
     digest: str
     size: int
 
     @classmethod
-    def from_manifest(cls, manifest: dict) -> "Subject":
+    def from_manifest(cls, manifest: Union[dict, bytes]) -> "Subject":
         """
         Create a new Subject from a Manifest
 
-        :param manifest: manifest to convert to subject
+        The manifest can also be provided as the raw bytes it was pushed or
+        pulled with, in which case they are hashed as is (and not serialized again).
+
+        :param manifest: manifest (or raw manifest bytes) to convert to subject
         """
-        manifest_string = json.dumps(manifest).encode("utf-8")
-        digest = "sha256:" + hashlib.sha256(manifest_string).hexdigest()
+        if isinstance(manifest, bytes):
+            manifest_string = manifest
+            manifest = oras.utils.load_json(manifest_string)
+        else:
+            manifest_string = serialize_manifest(manifest)
+        digest = content_digest(manifest_string)
         size = len(manifest_string)
 
         return cls(
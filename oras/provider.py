@@ -2,18 +2,24 @@ __author__ = "Vanessa Sochat"
 __copyright__ = "Copyright The ORAS Authors."
 __license__ = "Apache-2.0"
 
-import copy
+import asyncio
+import functools
 import os
+import shutil
+import stat
 import sys
+import threading
 import urllib
-from contextlib import contextmanager, nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import asdict
 from http.cookiejar import DefaultCookiePolicy
 from tempfile import TemporaryDirectory
-from typing import Callable, Generator, List, Optional, Tuple, Union
+from typing import BinaryIO, Callable, Generator, List, Optional, Tuple, Union
 
-import jsonschema
 import requests
+import urllib3
+from requests.adapters import HTTPAdapter
 
 import oras.auth
 import oras.container
@@ -21,7 +27,6 @@ import oras.decorator as decorator
 import oras.defaults
 import oras.main.login as login
 import oras.oci
-import oras.schemas
 import oras.utils
 from oras.logger import logger
 from oras.types import container_type
@@ -36,6 +41,19 @@ def temporary_empty_config() -> Generator[str, None, None]:
         yield config_file
 
 
+class RegistryRetry(urllib3.Retry):
+    """
+    Retry (some) responses, but don't wait longer than max_retry_after seconds,
+    whatever the Retry-After header of the registry asks for.
+    """
+
+    def get_retry_after(self, response) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, oras.defaults.max_retry_after)
+
+
 class Registry:
     """
     Direct interactions with an OCI registry.
@@ -50,6 +68,9 @@ class Registry:
         insecure: bool = False,
         tls_verify: bool = True,
         auth_backend: str = "token",
+        chunk_size: int = oras.defaults.default_chunksize,
+        max_concurrency: int = oras.defaults.default_max_workers,
+        session: Optional[requests.Session] = None,
     ):
         """
         Create an ORAS client.
@@ -62,13 +83,28 @@ class Registry:
         :type registry: oras.provider.Registry or None
         :param insecure: use http instead of https
         :type insecure: bool
+        :param chunk_size: default chunk size in bytes for chunked uploads
+        :type chunk_size: int
+        :param max_concurrency: maximum number of blobs to upload (or download) at once
+        :type max_concurrency: int
+        :param session: use this session (and its adapters) for all requests
+        :type session: requests.Session
         """
         self.hostname: Optional[str] = hostname
+        self.chunk_size = chunk_size
+        self.max_concurrency = max_concurrency
+
+        # Blob downloads (and ranges of them) in flight at once, across all of
+        # the layers that are pulled in parallel
+        self._download_slots = threading.BoundedSemaphore(max_concurrency)
         self.headers: dict = {}
-        self.session: requests.Session = requests.Session()
+        self.session: requests.Session = session or requests.Session()
         self.prefix: str = "http" if insecure else "https"
         self._tls_verify = tls_verify
 
+        # Requests can be done in parallel, but should authenticate one at a time
+        self._auth_lock = threading.Lock()
+
         if not tls_verify:
             requests.packages.urllib3.disable_warnings()  # type: ignore
 
@@ -77,6 +113,31 @@ class Registry:
         # trying to set further CSRF cookies (Harbor is such a case)
         self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
 
+        # Keep enough connections alive to reuse them across (parallel) requests.
+        # Only idempotent requests are retried for these statuses (a POST or
+        # PATCH of an upload is not safe to repeat), and the response is
+        # returned to us after the last retry. Connection and read errors are
+        # left to the retry decorator of do_request, so the two don't multiply.
+        # A session that is passed in keeps its own adapters.
+        if session is None:
+            adapter = HTTPAdapter(
+                pool_connections=oras.defaults.default_pool_connections,
+                pool_maxsize=max(oras.defaults.default_pool_maxsize, max_concurrency),
+                max_retries=RegistryRetry(
+                    total=oras.defaults.default_max_retries,
+                    connect=0,
+                    read=0,
+                    backoff_factor=0.2,
+                    status_forcelist=oras.defaults.default_retry_statuses,
+                    raise_on_status=False,
+                ),
+            )
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
+
+            # Identify as oras-py to registries, as token requests already do
+            self.session.headers["User-Agent"] = "oras-py"
+
         # Get custom backend, pass on session to share
         self.auth = oras.auth.get_auth_backend(auth_backend, self.session, insecure)
 
@@ -113,7 +174,7 @@ class Registry:
         """
         Delete one or more tags for a unique resource identifier.
 
-        Returns those successfully deleted.
+        Returns those successfully deleted. Tags are deleted in parallel.
 
         :param name: container URI to parse
         :type name: str
@@ -122,11 +183,12 @@ class Registry:
         """
         if isinstance(tags, str):
             tags = [tags]
-        deleted = []
-        for tag in tags:
-            if self.delete_tag(name, tag):
-                deleted.append(tag)
-        return deleted
+        container = self.get_container(name)
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            results = list(
+                executor.map(lambda tag: self.delete_tag(container, tag), tags)
+            )
+        return [tag for tag, deleted in zip(tags, results) if deleted]
 
     def logout(self, hostname: str):
         """
@@ -216,14 +278,24 @@ class Registry:
         """
         self.headers.update({name: value})
 
-    def _validate_path(self, path: str) -> bool:
+    def _validate_path(self, path: str, cwd: Optional[str] = None) -> bool:
         """
         Ensure a blob path is in the present working directory or below.
 
         :param path: the path to validate
         :type path: str
+        :param cwd: the present working directory, if already known
+        :type cwd: str
         """
-        return os.getcwd() in os.path.abspath(path)
+        # The same as os.path.abspath, without getting the cwd again
+        cwd = cwd or os.getcwd()
+        try:
+            path = os.path.normpath(os.path.join(cwd, path))
+            return os.path.commonpath([cwd, path]) == cwd
+
+        # Paths on different drives (Windows) have no common path
+        except ValueError:
+            return False
 
     def _parse_manifest_ref(self, ref: str) -> Tuple[str, str]:
         """
@@ -251,7 +323,8 @@ class Registry:
         container: container_type,
         layer: dict,
         do_chunked: bool = False,
-        chunk_size: int = oras.defaults.default_chunksize,
+        chunk_size: Optional[int] = None,
+        from_repo: Optional[str] = None,
     ) -> requests.Response:
         """
         Prepare and upload a blob.
@@ -264,38 +337,61 @@ class Registry:
         :type blob: str
         :param container:  parsed container URI
         :type container: oras.container.Container or str
-        :param layer: dict from oras.oci.NewLayer
+        :param layer: dict from oras.oci.NewLayer, the digest is added if missing
         :type layer: dict
         :param do_chunked: if true do chunked blob upload. This allows upload of larger oci artifacts.
         :type do_chunked: bool
-        :param chunk_size: if true use chunked upload.
+        :param chunk_size: chunk size in bytes, defaults to the client chunk size
         :type chunk_size: int
+        :param from_repo: try to mount the blob from this repository first
+        :type from_repo: str
         """
+        chunk_size = chunk_size or self.chunk_size
         blob = os.path.abspath(blob)
         container = self.get_container(container)
 
-        if self.blob_exists(layer, container):
+        # Chunked for large, otherwise POST and PUT
+        # This is currently disabled unless the user asks for it, as
+        # it doesn't seem to work for all registries. A blob that fits in
+        # one chunk is always uploaded with a PUT, saving a request.
+        do_chunked = do_chunked and layer["size"] > chunk_size
+
+        # A layer without a digest gets the one computed while it is sent in
+        # chunks. A single PUT needs it up front.
+        if "digest" not in layer and not do_chunked:
+            layer["digest"] = f"sha256:{oras.utils.get_file_hash(blob)}"
+
+        # Without a digest there is nothing to check for (or mount) yet
+        if "digest" in layer and self.blob_exists(layer, container):
             logger.debug(f'layer already exists: {layer["digest"]}')
             response = requests.Response()
             response.status_code = 200
             return response
 
-        # Chunked for large, otherwise POST and PUT
-        # This is currently disabled unless the user asks for it, as
-        # it doesn't seem to work for all registries
+        # A registry that doesn't mount the blob opens an upload session instead
+        session_url = None
+        if from_repo and "digest" in layer:
+            response = self.mount_blob(layer, container, from_repo)
+            if response.status_code == 201:
+                logger.debug(f'layer mounted from {from_repo}: {layer["digest"]}')
+                return response
+            if response.status_code == 202:
+                session_url = self._get_location(response, container)
+
         if not do_chunked:
-            response = self.put_upload(blob, container, layer)
+            response = self.put_upload(blob, container, layer, session_url=session_url)
         else:
             response = self.chunked_upload(
                 blob,
                 container,
                 layer,
                 chunk_size=chunk_size,
+                session_url=session_url,
             )
 
         # If we have an empty layer digest and the registry didn't accept, just return dummy successful response
         if (
-            response.status_code not in [200, 201, 202]
+            not 200 <= response.status_code <= 202
             and layer["digest"] == oras.defaults.blank_hash
         ):
             response = requests.Response()
@@ -331,7 +427,14 @@ class Registry:
             raise RuntimeError("Expected to find Docker-Content-Digest header.")
 
         delete_url = f"{self.prefix}://{container.manifest_url(digest)}"  # type: ignore
-        response = self.do_request(delete_url, "DELETE")
+        response = self.do_request(delete_url, "DELETE", headers=dict(self.headers))
+
+        # Another tag of the same manifest may have been deleted in the meantime
+        if response.status_code == 404:
+            logger.error(
+                f"Manifest {digest} for tag {container}:{tag} is already deleted"
+            )
+            return False
         if response.status_code != 202:
             raise RuntimeError("Delete was not successful: {response.json()}")
         return True
@@ -354,7 +457,7 @@ class Registry:
             """
             Determine if we should continue based on new tags and under limit.
             """
-            json = response.json()
+            json = oras.utils.load_json(response.content)
             new_tags = json.get("tags") or []
             tags.extend(new_tags)
             return len(new_tags) and (retrieve_all or len(tags) < N)
@@ -483,7 +586,11 @@ class Registry:
 
     @decorator.ensure_container
     def download_blob(
-        self, container: container_type, digest: str, outfile: str
+        self,
+        container: container_type,
+        digest: str,
+        outfile: str,
+        size: Optional[int] = None,
     ) -> str:
         """
         Stream download a blob into an output file.
@@ -492,18 +599,21 @@ class Registry:
 
         :param container:  parsed container URI
         :type container: oras.container.Container or str
+        :param size: size of the blob if known, large blobs are downloaded in parallel ranges
+        :type size: int
         """
         try:
             # Ensure output directory exists first
             outdir = os.path.dirname(outfile)
             if outdir and not os.path.exists(outdir):
                 oras.utils.mkdir_p(outdir)
-            with self.get_blob(container, digest, stream=True) as r:
-                r.raise_for_status()
-                with open(outfile, "wb") as f:
-                    for chunk in r.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
+            if (
+                size is not None
+                and size > oras.defaults.parallel_download_size
+                and self.max_concurrency > 1
+            ):
+                return self._download_blob_ranges(container, digest, outfile, size)
+            self._download_blob_stream(container, digest, outfile)
 
         # Allow an empty layer to fail and return /dev/null
         except Exception as e:
@@ -512,11 +622,127 @@ class Registry:
             raise e
         return outfile
 
+    def _download_blob_stream(
+        self, container: oras.container.Container, digest: str, outfile: str
+    ):
+        """
+        Download a blob into an output file in a single (streamed) request.
+
+        :param container:  parsed container URI
+        :type container: oras.container.Container
+        :param digest: the digest of the blob
+        :type digest: str
+        :param outfile: output file path
+        :type outfile: str
+        """
+        with self._download_slots, self.get_blob(container, digest, stream=True) as r:
+            r.raise_for_status()
+            self._write_blob(r, outfile)
+
+    def _write_blob(self, response: requests.Response, outfile: str):
+        """
+        Write a streamed blob response to a file.
+
+        :param response: the (streamed) response with the blob
+        :type response: requests.Response
+        :param outfile: output file path
+        :type outfile: str
+        """
+        # Copy from the raw stream (decoded, as iter_content would) in large reads
+        response.raw.decode_content = True
+        with open(outfile, "wb") as f:
+            shutil.copyfileobj(response.raw, f, length=1024 * 1024)
+
+    def _download_blob_ranges(
+        self,
+        container: oras.container.Container,
+        digest: str,
+        outfile: str,
+        size: int,
+    ) -> str:
+        """
+        Download a large blob in ranges of the chunk size, in parallel.
+
+        Each range is written in place in the output file. If the registry
+        doesn't return a range, the whole blob is streamed instead. Ranges share
+        the download slots of the client, so parallel pulls don't open more
+        than max_concurrency requests at once.
+
+        :param container:  parsed container URI
+        :type container: oras.container.Container
+        :param size: size of the blob
+        :type size: int
+        """
+        blob_url = f"{self.prefix}://{container.get_blob_url(digest)}"
+
+        def get_range(start: int) -> requests.Response:
+            headers = dict(self.headers)
+            headers["Range"] = f"bytes={start}-{min(start + self.chunk_size, size) - 1}"
+            response = self.do_request(blob_url, "GET", headers=headers, stream=True)
+            response.raise_for_status()
+            return response
+
+        def write_range(start: int, response: requests.Response) -> bool:
+            """
+            Write a range in place, or return False if it wasn't a range.
+            """
+            with response:
+                if response.status_code != 206:
+                    return False
+                response.raw.decode_content = True
+                with open(outfile, "r+b") as f:
+                    f.seek(start)
+                    shutil.copyfileobj(response.raw, f, length=1024 * 1024)
+                    if f.tell() != min(start + self.chunk_size, size):
+                        raise ValueError(f"Issue with {blob_url}: incomplete range")
+            return True
+
+        def download_range(start: int) -> bool:
+            with self._download_slots:
+                if stopped.is_set():
+                    return True
+                return write_range(start, get_range(start))
+
+        # The first response tells us if the registry supports ranges, and the
+        # other ranges are downloaded while it is written. On an error (or a
+        # registry that stops returning ranges) the pending ones are cancelled,
+        # including those already waiting for a download slot.
+        stopped = threading.Event()
+        ranges = True
+        futures: list = []
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            try:
+                with self._download_slots:
+                    response = get_range(0)
+                    if response.status_code != 206:
+                        with response:
+                            self._write_blob(response, outfile)
+                        return outfile
+
+                    with open(outfile, "wb") as f:
+                        f.truncate(size)
+                    futures = [
+                        executor.submit(download_range, start)
+                        for start in range(self.chunk_size, size, self.chunk_size)
+                    ]
+                    write_range(0, response)
+                ranges = all(future.result() for future in futures)
+            finally:
+                stopped.set()
+                for future in futures:
+                    future.cancel()
+
+        if not ranges:
+            logger.debug(f"{blob_url} did not return a range, downloading it whole")
+            self._download_blob_stream(container, digest, outfile)
+        return outfile
+
     def put_upload(
         self,
         blob: str,
         container: oras.container.Container,
         layer: dict,
+        session_url: Optional[str] = None,
     ) -> requests.Response:
         """
         Upload to a registry via put.
@@ -527,17 +753,20 @@ class Registry:
         :type container: oras.container.Container or str
         :param layer: dict from oras.oci.NewLayer
         :type layer: dict
+        :param session_url: an upload session that is already open, if any
+        :type session_url: str
         """
         # Start an upload session
-        headers = {"Content-Type": "application/octet-stream"}
+        if not session_url:
+            headers = {"Content-Type": "application/octet-stream"}
 
-        upload_url = f"{self.prefix}://{container.upload_blob_url()}"
-        r = self.do_request(upload_url, "POST", headers=headers)
+            upload_url = f"{self.prefix}://{container.upload_blob_url()}"
+            r = self.do_request(upload_url, "POST", headers=headers)
 
-        # Location should be in the header
-        session_url = self._get_location(r, container)
-        if not session_url:
-            raise ValueError(f"Issue retrieving session url: {r.json()}")
+            # Location should be in the header
+            session_url = self._get_location(r, container)
+            if not session_url:
+                raise ValueError(f"Issue retrieving session url: {r.json()}")
 
         # PUT to upload blob url
         headers = {
@@ -548,11 +777,12 @@ class Registry:
         blob_url = oras.utils.append_url_params(
             session_url, {"digest": layer["digest"]}
         )
-        with open(blob, "rb") as fd:
+        # Stream (or map) the file, and don't read the whole blob into memory
+        with open(blob, "rb") as fd, oras.utils.upload_body(fd) as data:
             response = self.do_request(
                 blob_url,
                 method="PUT",
-                data=fd.read(),
+                data=data,
                 headers=headers,
             )
         return response
@@ -568,10 +798,38 @@ class Registry:
         :param container: the container to determine where to look for layer existence
         :type container: oras.container.Container
         """
+        # Headers are needed to send (and respond to a request for) auth
         blob_url = container.get_blob_url(layer["digest"])
-        response = self.do_request(f"{self.prefix}://{blob_url}", "HEAD")
+        response = self.do_request(
+            f"{self.prefix}://{blob_url}", "HEAD", headers=dict(self.headers)
+        )
         return response.status_code == 200
 
+    def mount_blob(
+        self, layer: dict, container: oras.container.Container, from_repo: str
+    ) -> requests.Response:
+        """
+        Mount a blob from another repository of the registry, without uploading it.
+
+        A 201 response means the blob was mounted. If the registry can't mount
+        the blob, it starts a regular upload session instead (a 202 with its
+        location), which can be used to upload the blob.
+
+        :param layer: the layer to mount
+        :type layer: dict
+        :param container: the container to mount the blob into
+        :type container: oras.container.Container
+        :param from_repo: the repository (e.g., namespace/name) with the blob
+        :type from_repo: str
+        """
+        mount_url = oras.utils.append_url_params(
+            f"{self.prefix}://{container.upload_blob_url()}",
+            {"mount": layer["digest"], "from": from_repo},
+        )
+        headers = {"Content-Length": "0"}
+        headers.update(self.headers)
+        return self.do_request(mount_url, "POST", headers=headers)
+
     def _get_location(
         self, r: requests.Response, container: oras.container.Container
     ) -> str:
@@ -603,7 +861,8 @@ class Registry:
         blob: str,
         container: oras.container.Container,
         layer: dict,
-        chunk_size: int = oras.defaults.default_chunksize,
+        chunk_size: Optional[int] = None,
+        session_url: Optional[str] = None,
     ) -> requests.Response:
         """
         Upload via a chunked upload.
@@ -612,48 +871,82 @@ class Registry:
         :type blob: str
         :param container:  parsed container URI
         :type container: oras.container.Container or str
-        :param layer: dict from oras.oci.NewLayer
+        :param layer: dict from oras.oci.NewLayer, the digest is added if missing
         :type layer: dict
-        :param chunk_size: chunk size in bytes
+        :param chunk_size: chunk size in bytes, defaults to the client chunk size
         :type chunk_size: int
+        :param session_url: an upload session that is already open, if any
+        :type session_url: str
         """
+        chunk_size = chunk_size or self.chunk_size
+
         # Start an upload session
-        headers = {"Content-Type": "application/octet-stream", "Content-Length": "0"}
-        headers.update(self.headers)
+        if not session_url:
+            headers = {
+                "Content-Type": "application/octet-stream",
+                "Content-Length": "0",
+            }
+            headers.update(self.headers)
 
-        upload_url = f"{self.prefix}://{container.upload_blob_url()}"
-        r = self.do_request(upload_url, "POST", headers=headers)
+            upload_url = f"{self.prefix}://{container.upload_blob_url()}"
+            r = self.do_request(upload_url, "POST", headers=headers)
 
-        # Location should be in the header
-        session_url = self._get_location(r, container)
-        if not session_url:
-            raise ValueError(f"Issue retrieving session url: {r.json()}")
+            # Location should be in the header
+            session_url = self._get_location(r, container)
+            if not session_url:
+                raise ValueError(f"Issue retrieving session url: {r.json()}")
 
-        # Read the blob in chunks, for each do a patch
-        start = 0
+        # For each chunk of the blob do a patch, streaming it from the file.
+        # Only the range (and the length of the last chunk) changes.
+        headers = {
+            "Content-Type": "application/octet-stream",
+            "Content-Length": str(chunk_size),
+        }
+        headers.update(self.headers)
+
+        # The blob is hashed as it is sent, to verify what was uploaded
+        hasher = oras.utils.get_hasher("sha256")()
+        too_large = False
         with open(blob, "rb") as fd:
-            for chunk in oras.utils.read_in_chunks(fd, chunk_size=chunk_size):
-                end = start + len(chunk) - 1
-                content_range = "%s-%s" % (start, end)
-                headers = {
-                    "Content-Range": content_range,
-                    "Content-Length": str(len(chunk)),
-                    "Content-Type": "application/octet-stream",
-                }
-                headers.update(self.headers)
-
-                # Important to update with auth token if acquired
-                # TODO call to auth here
-                start = end + 1
-                self._check_200_response(
-                    r := self.do_request(
-                        session_url, "PATCH", data=chunk, headers=headers
-                    )
-                )
+            for start, chunk in oras.utils.iter_file_slices(fd, chunk_size, hasher):
+                length = len(chunk)
+                headers["Content-Range"] = f"{start}-{start + length - 1}"
+                if length != chunk_size:
+                    headers["Content-Length"] = str(length)
+                r = self.do_request(session_url, "PATCH", data=chunk, headers=headers)
+
+                # Registries can limit the size of a chunk, so start over with a
+                # smaller one if the first is too large
+                if (
+                    r.status_code == 413
+                    and start == 0
+                    and length > oras.defaults.min_chunksize
+                ):
+                    too_large = True
+                    break
+                self._check_200_response(r)
                 session_url = self._get_location(r, container)
                 if not session_url:
                     raise ValueError(f"Issue retrieving session url: {r.json()}")
 
+        # Nothing was written to the session yet, so keep using it
+        if too_large:
+            chunk_size = max(length // 2, oras.defaults.min_chunksize)
+            logger.debug(f"Chunk too large, retrying upload with {chunk_size} bytes")
+            return self.chunked_upload(
+                blob, container, layer, chunk_size, session_url=session_url
+            )
+
+        # Don't close the blob if it changed since the layer was created. A layer
+        # without a digest gets the one computed while sending it.
+        digest = "sha256:" + hasher.hexdigest()
+        if "digest" not in layer:
+            layer["digest"] = digest
+        elif digest != layer["digest"]:
+            raise ValueError(
+                f"{blob} was changed during upload, expected digest {layer['digest']} but sent {digest}."
+            )
+
         # Finally, issue a PUT request to close blob
         session_url = oras.utils.append_url_params(
             session_url, {"digest": layer["digest"]}
@@ -667,7 +960,7 @@ class Registry:
         :param response: request response to inspect
         :type response: requests.Response
         """
-        if response.status_code not in [200, 201, 202]:
+        if not 200 <= response.status_code <= 202:
             self._parse_response_errors(response)
             raise ValueError(f"Issue with {response.request.url}: {response.reason}")
 
@@ -678,13 +971,18 @@ class Registry:
         :param response: request response to inspect
         :type response: requests.Response
         """
+        # Responses to HEAD requests (and some errors) have no body to parse
+        if not response.content:
+            return
         try:
             msg = response.json()
-            for error in msg.get("errors", []):
-                if isinstance(error, dict) and "message" in error:
-                    logger.error(error["message"])
-        except Exception:
-            pass
+        except ValueError:
+            return
+        if not isinstance(msg, dict):
+            return
+        for error in msg.get("errors") or []:
+            if isinstance(error, dict) and "message" in error:
+                logger.error(error["message"])
 
     def upload_manifest(
         self,
@@ -699,16 +997,20 @@ class Registry:
         :param container:  parsed container URI
         :type container: oras.container.Container or str
         """
-        jsonschema.validate(manifest, schema=oras.schemas.manifest)
+        oras.oci.validate_manifest(manifest)
+
+        # Serialize once, the same way as oras.oci.Subject.from_manifest, so
+        # the digest of a manifest dict matches what was pushed.
+        body = oras.oci.serialize_manifest(manifest)
         headers = {
             "Content-Type": oras.defaults.default_manifest_media_type,
-            "Content-Length": str(len(manifest)),
+            "Content-Length": str(len(body)),
         }
         return self.do_request(
             f"{self.prefix}://{container.manifest_url()}",  # noqa
             "PUT",
             headers=headers,
-            json=manifest,
+            data=body,
         )
 
     def push(
@@ -722,7 +1024,9 @@ class Registry:
         manifest_annotations: Optional[dict] = None,
         subject: Optional[str] = None,
         do_chunked: bool = False,
-        chunk_size: int = oras.defaults.default_chunksize,
+        chunk_size: Optional[int] = None,
+        from_repo: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
     ) -> requests.Response:
         """
         Push a set of files to a target
@@ -743,10 +1047,14 @@ class Registry:
         :type target: str
         :param do_chunked: if true do chunked blob upload
         :type do_chunked: bool
-        :param chunk_size: chunk size in bytes
+        :param chunk_size: chunk size in bytes, defaults to the client chunk size
         :type chunk_size: int
         :param subject: optional subject reference
         :type subject: oras.oci.Subject
+        :param from_repo: repository of the registry to try to mount blobs from
+        :type from_repo: str
+        :param max_concurrency: blobs to upload at once, defaults to the client max_concurrency
+        :type max_concurrency: int
         """
         container = self.get_container(target)
         files = files or []
@@ -759,74 +1067,95 @@ class Registry:
 
         # A lookup of annotations we can add (to blobs or manifest)
         annotset = oras.oci.Annotations(annotation_file)
-        media_type = None
-
-        # Upload files as blobs
-        for blob in files:
-            # You can provide a blob + content type
-            path_content: PathAndOptionalContent = oras.utils.split_path_and_content(
-                str(blob)
-            )
-            blob = path_content.path
-            media_type = path_content.content
-
-            # Must exist
-            if not os.path.exists(blob):
-                raise FileNotFoundError(f"{blob} does not exist.")
-
-            # Path validation means blob must be relative to PWD.
-            if not disable_path_validation:
-                if not self._validate_path(blob):
-                    raise ValueError(
-                        f"Blob {blob} is not in the present working directory context."
-                    )
-
-            # Save directory or blob name before compressing
-            blob_name = os.path.basename(blob)
-
-            # If it's a directory, we need to compress
-            cleanup_blob = False
-            if os.path.isdir(blob):
-                blob = oras.utils.make_targz(blob)
-                cleanup_blob = True
-
-            # Create a new layer from the blob
-            layer = oras.oci.NewLayer(blob, is_dir=cleanup_blob, media_type=media_type)
-            annotations = annotset.get_annotations(blob)
-
-            # Always strip blob_name of path separator
-            layer["annotations"] = {
-                oras.defaults.annotation_title: blob_name.strip(os.sep)
-            }
-            if annotations:
-                layer["annotations"].update(annotations)
-
-            # update the manifest with the new layer
-            manifest["layers"].append(layer)
-            logger.debug(f"Preparing layer {layer}")
 
-            # Upload the blob layer
-            response = self.upload_blob(
-                blob,
-                container,
-                layer,
-                do_chunked=do_chunked,
-                chunk_size=chunk_size,
-            )
-            self._check_200_response(response)
-
-            # Do we need to cleanup a temporary targz?
-            if cleanup_blob and os.path.exists(blob):
-                os.remove(blob)
+        # Prepare the blobs to upload, compressing directories
+        blobs: List[str] = []
+        blob_names: List[str] = []
+        media_types: List[Optional[str]] = []
+        is_dirs: List[bool] = []
+        cwd = os.getcwd()
+        try:
+            for blob in files:
+                # You can provide a blob + content type
+                path_content: PathAndOptionalContent = (
+                    oras.utils.split_path_and_content(str(blob))
+                )
+                blob = path_content.path
+
+                # Must exist, stat once to also know if it's a directory
+                try:
+                    st = os.stat(blob)
+                except FileNotFoundError:
+                    raise FileNotFoundError(f"{blob} does not exist.")
+
+                # Path validation means blob must be relative to PWD.
+                if not disable_path_validation:
+                    if not self._validate_path(blob, cwd):
+                        raise ValueError(
+                            f"Blob {blob} is not in the present working directory context."
+                        )
+
+                # Save directory or blob name before compressing
+                blob_names.append(os.path.basename(blob))
+                media_types.append(path_content.content)
+                is_dirs.append(stat.S_ISDIR(st.st_mode))
+
+                # If it's a directory, we need to compress
+                if is_dirs[-1]:
+                    blob = oras.utils.make_targz(blob)
+                blobs.append(blob)
+
+            # Create the layers, in the same order as the files
+            layers = oras.oci.NewLayers(blobs, media_types, is_dirs)
+            for blob, blob_name, layer in zip(blobs, blob_names, layers):
+                annotations = annotset.get_annotations(blob)
+
+                # Always strip blob_name of path separator
+                layer["annotations"] = {
+                    oras.defaults.annotation_title: blob_name.strip(os.sep)
+                }
+                if annotations:
+                    layer["annotations"].update(annotations)
+
+                # update the manifest with the new layer
+                manifest["layers"].append(layer)
+                logger.debug(f"Preparing layer {layer}")
+
+            # Upload the blob layers in parallel
+            def upload_layer(blob: str, layer: dict):
+                response = self.upload_blob(
+                    blob,
+                    container,
+                    layer,
+                    do_chunked=do_chunked,
+                    chunk_size=chunk_size,
+                    from_repo=from_repo,
+                )
+                self._check_200_response(response)
+
+            # The first upload authenticates (if needed) with the scopes a push
+            # asks for, so the parallel uploads don't each start with a 401
+            if blobs:
+                upload_layer(blobs[0], layers[0])
+            with ThreadPoolExecutor(
+                max_workers=max_concurrency or self.max_concurrency
+            ) as executor:
+                list(executor.map(upload_layer, blobs[1:], layers[1:]))
+
+        # Do we need to cleanup temporary targz?
+        finally:
+            for blob, is_dir in zip(blobs, is_dirs):
+                if is_dir and os.path.exists(blob):
+                    os.remove(blob)
 
         # Add annotations to the manifest, if provided
         manifest_annots = annotset.get_annotations("$manifest") or {}
 
         # Custom manifest annotations from client key=value pairs
-        # These over-ride any potentially provided from file
-        custom_annots = copy.deepcopy(manifest_annotations)
-        if custom_annots:
-            manifest_annots.update(custom_annots)
+        # These over-ride any potentially provided from file. Annotation values
+        # are strings, so updating copies them without a deepcopy.
+        if manifest_annotations:
+            manifest_annots.update(manifest_annotations)
         if manifest_annots:
             manifest["annotations"] = manifest_annots
 
@@ -845,16 +1174,19 @@ class Registry:
         if config_annots:
             conf["annotations"] = config_annots
 
-        # Config is just another layer blob!
+        # Config is just another layer blob! The empty config is usually already
+        # in the registry, so only write a temporary file for it if needed.
         logger.debug(f"Preparing config {conf}")
-        with (
-            temporary_empty_config()
-            if config_file is None
-            else nullcontext(config_file)
-        ) as config_file:
+        if config_file is not None:
             response = self.upload_blob(config_file, container, conf)
-
-        self._check_200_response(response)
+            self._check_200_response(response)
+        elif self.blob_exists(conf, container):
+            logger.debug(f'config already exists: {conf["digest"]}')
+        else:
+            # We just checked, so upload it without checking again
+            with temporary_empty_config() as config_file:
+                response = self.put_upload(config_file, container, conf)
+            self._check_200_response(response)
 
         # Final upload of the manifest
         manifest["config"] = conf
@@ -865,6 +1197,30 @@ class Registry:
         print(f"Successfully pushed {container}")
         return response
 
+    async def apush(self, *args, **kwargs) -> requests.Response:
+        """
+        Push a set of files to a target from a coroutine.
+
+        The arguments are the same as for push, which is run in the default
+        executor of the event loop so it doesn't block other tasks.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(self.push, *args, **kwargs)
+        )
+
+    async def apull(self, *args, **kwargs) -> List[str]:
+        """
+        Pull an artifact from a target from a coroutine.
+
+        The arguments are the same as for pull, which is run in the default
+        executor of the event loop so it doesn't block other tasks.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(self.pull, *args, **kwargs)
+        )
+
     def pull(
         self,
         target: str,
@@ -898,6 +1254,7 @@ class Registry:
         overwrite = overwrite
 
         files = []
+        layers = {}
         for layer in manifest.get("layers", []):
             filename = (layer.get("annotations") or {}).get(
                 oras.defaults.annotation_title
@@ -916,21 +1273,48 @@ class Registry:
                 )
                 continue
 
-            # A directory will need to be uncompressed and moved
-            if layer["mediaType"] == oras.defaults.default_blob_dir_media_type:
-                targz = oras.utils.get_tmpfile(suffix=".tar.gz")
-                self.download_blob(container, layer["digest"], targz)
-
-                # The artifact will be extracted to the correct name
-                oras.utils.extract_targz(targz, os.path.dirname(outfile))
-
-            # Anything else just extracted directly
-            else:
-                self.download_blob(container, layer["digest"], outfile)
-            logger.info(f"Successfully pulled {outfile}.")
+            # If two layers have the same output file, the last one wins
+            layers[outfile] = layer
             files.append(outfile)
+
+        # Download the layers in parallel
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            list(
+                executor.map(
+                    lambda outfile: self._pull_layer(
+                        container, layers[outfile], outfile
+                    ),
+                    layers,
+                )
+            )
         return files
 
+    def _pull_layer(
+        self, container: oras.container.Container, layer: dict, outfile: str
+    ):
+        """
+        Download a single layer of an artifact, extracting a directory.
+
+        :param container:  parsed container URI
+        :type container: oras.container.Container
+        :param layer: the layer from the manifest
+        :type layer: dict
+        :param outfile: output file (or directory) path
+        :type outfile: str
+        """
+        # A directory will need to be uncompressed and moved
+        if layer["mediaType"] == oras.defaults.default_blob_dir_media_type:
+            targz = oras.utils.get_tmpfile(suffix=".tar.gz")
+            self.download_blob(container, layer["digest"], targz, layer.get("size"))
+
+            # The artifact will be extracted to the correct name
+            oras.utils.extract_targz(targz, os.path.dirname(outfile))
+
+        # Anything else just extracted directly
+        else:
+            self.download_blob(container, layer["digest"], outfile, layer.get("size"))
+        logger.info(f"Successfully pulled {outfile}.")
+
     @decorator.ensure_container
     def get_manifest(
         self,
@@ -945,15 +1329,16 @@ class Registry:
         :param allowed_media_type: one or more allowed media types
         :type allowed_media_type: str
         """
+        # Media types in an Accept header are separated by commas
         if not allowed_media_type:
             allowed_media_type = [oras.defaults.default_manifest_media_type]
-        headers = {"Accept": ";".join(allowed_media_type)}
+        headers = {"Accept": ",".join(allowed_media_type)}
 
         get_manifest = f"{self.prefix}://{container.manifest_url()}"  # type: ignore
         response = self.do_request(get_manifest, "GET", headers=headers)
         self._check_200_response(response)
-        manifest = response.json()
-        jsonschema.validate(manifest, schema=oras.schemas.manifest)
+        manifest = oras.utils.load_json(response.content)
+        oras.oci.validate_manifest(manifest)
         return manifest
 
     @decorator.retry()
@@ -961,7 +1346,7 @@ class Registry:
         self,
         url: str,
         method: str = "GET",
-        data: Optional[Union[dict, bytes]] = None,
+        data: Optional[Union[dict, bytes, BinaryIO]] = None,
         headers: Optional[dict] = None,
         json: Optional[dict] = None,
         stream: bool = False,
@@ -973,8 +1358,8 @@ class Registry:
         :type url: str
         :param method: the method to use (GET, DELETE, POST, PUT, PATCH)
         :type method: str
-        :param data: data for requests
-        :type data: dict or bytes
+        :param data: data for requests, an open file is streamed
+        :type data: dict, bytes or file object
         :param headers: headers for the request
         :type headers: dict
         :param json: json data for requests
@@ -982,13 +1367,21 @@ class Registry:
         :param stream: stream the responses
         :type stream: bool
         """
-        # Make the request and return to calling function, but attempt to use auth token if previously obtained
-        if (
-            headers is not None
-            and isinstance(self.auth, oras.auth.TokenAuth)
-            and self.auth.token is not None
-        ):
-            headers.update(self.auth.get_auth_header())
+        # Encode json data once, rather than again for each retry with auth
+        if json is not None and data is None:
+            data = oras.utils.dump_json(json)
+            headers = {"Content-Type": "application/json", **(headers or {})}
+            json = None
+
+        # Headers are updated with auth below, so work on a (shallow) copy: callers
+        # pass self.headers, which is shared by requests done in parallel.
+        # Attempt to use auth (e.g., a token) if previously obtained.
+        if headers is not None:
+            headers = dict(headers)
+            headers.update(self.auth.get_request_auth_header())
+
+        # A streamed file body needs to be rewound before it is sent again
+        position = data.tell() if hasattr(data, "seek") else None
         response = self.session.request(
             method,
             url,
@@ -1003,10 +1396,14 @@ class Registry:
         if response.status_code not in [401, 403]:
             return response
 
-        # Otherwise, authenticate the request and retry
-        headers, changed = self.auth.authenticate_request(response, headers)
+        # Otherwise, authenticate the request and retry. A token obtained by
+        # another thread in the meantime is used as is.
+        with self._auth_lock:
+            headers, changed = self.auth.authenticate_request(response, headers)
         if not changed:
             raise ValueError("Cannot respond to request for authentication.")
+        if position is not None:
+            data.seek(position)  # type: ignore
         response = self.session.request(
             method,
             url,
@@ -1019,9 +1416,12 @@ class Registry:
 
         # One retry if 403 denied (need new token?)
         if response.status_code == 403:
-            headers, changed = self.auth.authenticate_request(
-                response, headers, refresh=True
-            )
+            with self._auth_lock:
+                headers, changed = self.auth.authenticate_request(
+                    response, headers, refresh=True
+                )
+            if position is not None:
+                data.seek(position)  # type: ignore
             response = self.session.request(
                 method,
                 url,
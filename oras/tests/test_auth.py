@@ -0,0 +1,189 @@
+__author__ = "Vanessa Sochat"
+__copyright__ = "Copyright The ORAS Authors."
+__license__ = "Apache-2.0"
+
+import hashlib
+import os
+import stat
+
+import requests
+
+import oras.auth
+import oras.auth.utils
+import oras.utils
+
+
+def get_challenge():
+    response = requests.Response()
+    response.status_code = 401
+    response.headers["Www-Authenticate"] = (
+        'Bearer realm="https://localhost:5000/token",service="registry",'
+        'scope="repository:dinosaur/artifact:pull"'
+    )
+    return response
+
+
+def test_token_cache(tmp_path, monkeypatch):
+    """
+    With ORAS_TOKEN_CACHE, a new client reuses an unexpired token
+    """
+    token_cache = str(tmp_path / "oras" / "tokens.json")
+    monkeypatch.setenv("ORAS_TOKEN_CACHE", token_cache)
+    requested = []
+
+    def request_anonymous_token(self, h):
+        requested.append(h.realm)
+        self.token_expires_in = 300
+        return "dinotoken"
+
+    monkeypatch.setattr(
+        oras.auth.TokenAuth, "request_anonymous_token", request_anonymous_token
+    )
+
+    headers, changed = oras.auth.TokenAuth().authenticate_request(get_challenge(), {})
+    assert changed and headers["Authorization"] == "Bearer dinotoken"
+    assert stat.S_IMODE(os.stat(token_cache).st_mode) == 0o600
+
+    # A new client (e.g., the next command) uses the cached token
+    auth = oras.auth.TokenAuth()
+    headers, changed = auth.authenticate_request(get_challenge(), {})
+    assert changed and auth.token == "dinotoken"
+    assert auth.get_auth_header() == {"Authorization": "Bearer dinotoken"}
+    assert len(requested) == 1
+
+    # An expired token is not used
+    cache = oras.utils.read_json(token_cache)
+    for entry in cache.values():
+        entry["expires_at"] = 0
+    oras.utils.write_json(cache, token_cache)
+    oras.auth.TokenAuth().authenticate_request(get_challenge(), {})
+    assert len(requested) == 2
+
+
+def test_token_cache_refresh(tmp_path, monkeypatch):
+    """
+    A refresh asks the realm for a new token instead of reusing the cached one
+    """
+    token_cache = str(tmp_path / "tokens.json")
+    monkeypatch.setenv("ORAS_TOKEN_CACHE", token_cache)
+    tokens = iter(["dinotoken", "newtoken"])
+
+    def request_anonymous_token(self, h):
+        self.token_expires_in = 300
+        return next(tokens)
+
+    monkeypatch.setattr(
+        oras.auth.TokenAuth, "request_anonymous_token", request_anonymous_token
+    )
+
+    auth = oras.auth.TokenAuth()
+    auth.authenticate_request(get_challenge(), {})
+    assert auth.token == "dinotoken"
+
+    # The registry rejected the token, e.g., it was revoked
+    headers, changed = auth.authenticate_request(get_challenge(), {}, refresh=True)
+    assert changed and headers["Authorization"] == "Bearer newtoken"
+    cached = [entry["token"] for entry in oras.utils.read_json(token_cache).values()]
+    assert cached == ["newtoken"]
+
+    # And the next client gets the new token from the cache
+    auth = oras.auth.TokenAuth()
+    auth.authenticate_request(get_challenge(), {})
+    assert auth.token == "newtoken"
+
+
+def test_token_cache_key(tmp_path, monkeypatch):
+    """
+    Tokens are cached per user, and nothing derived from the password is saved
+    """
+    token_cache = str(tmp_path / "tokens.json")
+    monkeypatch.setenv("ORAS_TOKEN_CACHE", token_cache)
+    monkeypatch.setattr(
+        oras.auth.TokenAuth, "request_token", lambda self, h: "dinotoken"
+    )
+
+    auth = oras.auth.TokenAuth()
+    auth.set_basic_auth("dinosaur", "rawr")
+    auth.authenticate_request(get_challenge(), {})
+    with open(token_cache) as fd:
+        content = fd.read()
+    assert "user:dinosaur" in content
+    basic = oras.auth.utils.get_basic_auth("dinosaur", "rawr")
+    assert basic not in content
+    assert hashlib.sha256(basic.encode()).hexdigest() not in content
+
+    # Another user (or no user) doesn't get the token
+    auth = oras.auth.TokenAuth()
+    auth.set_basic_auth("trex", "rawr")
+    h = oras.auth.utils.parse_auth_header(get_challenge().headers["Www-Authenticate"])
+    assert auth.get_cached_token(auth._get_token_cache_key(h)) is None
+    auth = oras.auth.TokenAuth()
+    assert auth.get_cached_token(auth._get_token_cache_key(h)) is None
+
+
+def test_token_cache_disabled(tmp_path, monkeypatch):
+    """
+    Tokens are not saved to disk by default
+    """
+    monkeypatch.delenv("ORAS_TOKEN_CACHE", raising=False)
+    auth = oras.auth.TokenAuth()
+    auth.token = "dinotoken"
+    auth.cache_token("key")
+    assert auth.get_cached_token("key") is None
+
+
+def test_basic_auth_header(monkeypatch):
+    """
+    The basic auth header is built when credentials are set
+    """
+    monkeypatch.setenv("ORAS_USER", "dinosaur")
+    monkeypatch.setenv("ORAS_PASS", "rawr")
+    auth = oras.auth.BasicAuth()
+    basic = oras.auth.utils.get_basic_auth("dinosaur", "rawr")
+    assert auth.get_auth_header() == {"Authorization": "Basic %s" % basic}
+
+    # The returned header can be updated without changing the next one
+    auth.get_auth_header()["Authorization"] = "Bearer nope"
+    headers, changed = auth.authenticate_request(get_challenge(), {"Accept": "*/*"})
+    assert changed
+    assert headers == {"Accept": "*/*", "Authorization": "Basic %s" % basic}
+
+    auth.set_basic_auth("trex", "roar")
+    assert auth.get_auth_header()["Authorization"].endswith(
+        oras.auth.utils.get_basic_auth("trex", "roar")
+    )
+
+
+def test_request_auth_header(monkeypatch):
+    """
+    Auth is sent with requests once a token or a challenge is known
+    """
+    monkeypatch.setenv("ORAS_USER", "dinosaur")
+    monkeypatch.setenv("ORAS_PASS", "rawr")
+    auth = oras.auth.BasicAuth()
+    assert auth.get_request_auth_header() == {}
+    auth.authenticate_request(get_challenge(), {})
+    assert auth.get_request_auth_header() == auth.get_auth_header()
+    auth._logout()
+    assert auth.get_request_auth_header() == {}
+
+    auth = oras.auth.TokenAuth()
+    assert auth.get_request_auth_header() == {}
+    auth.set_token_auth("dinotoken")
+    assert auth.get_request_auth_header() == {"Authorization": "Bearer dinotoken"}
+
+
+def test_parse_auth_header():
+    """
+    A parsed (and cached) challenge can be changed by the caller
+    """
+    raw = get_challenge().headers["Www-Authenticate"]
+    h = oras.auth.utils.parse_auth_header(raw)
+    assert h.realm == "https://localhost:5000/token"
+    assert h.service == "registry"
+    assert h.scope == "repository:dinosaur/artifact:pull"
+
+    h.realm = "changed"
+    assert oras.auth.utils.parse_auth_header(raw).realm == (
+        "https://localhost:5000/token"
+    )
@@ -0,0 +1,98 @@
+__author__ = "Vanessa Sochat"
+__copyright__ = "Copyright The ORAS Authors."
+__license__ = "Apache-2.0"
+
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import oras.auth.utils as auth_utils
+import oras.main.login as login
+import oras.utils
+
+
+def test_manual_login(tmp_path):
+    """
+    Manual login creates and updates a docker config file
+    """
+    dockercfg_path = str(tmp_path / "docker" / "config.json")
+    client = login.DockerClient()
+    res = client.login("myuser", "mypass", "localhost:5000", dockercfg_path)
+    assert res["Status"] == "Login Succeeded"
+
+    cfg = oras.utils.read_json(dockercfg_path)
+    assert cfg["auths"]["localhost:5000"]["auth"] == auth_utils.get_basic_auth(
+        "myuser", "mypass"
+    )
+
+    # Update an existing registry, and don't leave temporary or lock files behind
+    client.login("myuser", "newpass", "localhost:5000", dockercfg_path)
+    cfg = oras.utils.read_json(dockercfg_path)
+    assert cfg["auths"]["localhost:5000"]["auth"] == auth_utils.get_basic_auth(
+        "myuser", "newpass"
+    )
+    assert os.listdir(tmp_path / "docker") == ["config.json"]
+
+
+def test_manual_login_symlink(tmp_path):
+    """
+    A symlinked docker config stays a symlink, and its target is updated
+    """
+    target = tmp_path / "dotfiles" / "config.json"
+    target.parent.mkdir()
+    oras.utils.write_json({"auths": {}}, str(target))
+    dockercfg_path = tmp_path / "config.json"
+    dockercfg_path.symlink_to(target)
+
+    login.DockerClient().login(
+        "myuser", "mypass", "localhost:5000", str(dockercfg_path)
+    )
+    assert dockercfg_path.is_symlink()
+    cfg = oras.utils.read_json(str(target))
+    assert cfg["auths"]["localhost:5000"]["auth"] == auth_utils.get_basic_auth(
+        "myuser", "mypass"
+    )
+    assert os.listdir(target.parent) == ["config.json"]
+
+
+def test_manual_login_keeps_mode(tmp_path):
+    """
+    Updating a docker config keeps its permissions
+    """
+    dockercfg_path = tmp_path / "config.json"
+    oras.utils.write_json({"auths": {}}, str(dockercfg_path))
+    os.chmod(dockercfg_path, 0o640)
+
+    login.DockerClient().login(
+        "myuser", "mypass", "localhost:5000", str(dockercfg_path)
+    )
+    assert stat.S_IMODE(os.stat(dockercfg_path).st_mode) == 0o640
+
+    # A new config is only readable by the user
+    dockercfg_path = tmp_path / "new" / "config.json"
+    login.DockerClient().login(
+        "myuser", "mypass", "localhost:5000", str(dockercfg_path)
+    )
+    assert stat.S_IMODE(os.stat(dockercfg_path).st_mode) == 0o600
+
+
+@pytest.mark.skipif(
+    oras.utils.fileio.fcntl is None, reason="config locking requires fcntl"
+)
+def test_concurrent_manual_login(tmp_path):
+    """
+    Concurrent logins to different registries should not lose updates
+    """
+    dockercfg_path = str(tmp_path / "config.json")
+    registries = [f"registry-{i}.example.com" for i in range(16)]
+
+    def do_login(registry):
+        return login.DockerClient().login("myuser", "mypass", registry, dockercfg_path)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(do_login, registries))
+
+    cfg = oras.utils.read_json(dockercfg_path)
+    assert sorted(cfg["auths"]) == sorted(registries)
@@ -1,3 +1,7 @@
+import json
+from dataclasses import asdict
+
+import jsonschema
 import pytest
 
 import oras.defaults
@@ -18,3 +22,147 @@ def test_create_subject_from_manifest():
         == "sha256:7a6f84d8c73a71bf9417c13f721ed102f74afac9e481f89e5a72d28954e7d0c5"
     )
     assert subject.size == 126
+    assert not hasattr(subject, "__dict__")
+    assert asdict(subject) == {
+        "mediaType": subject.mediaType,
+        "digest": subject.digest,
+        "size": 126,
+    }
+
+
+def test_new_manifest_is_fresh():
+    """
+    Each new manifest should be equal to the empty manifest, but not shared
+    """
+    manifest = oras.oci.NewManifest()
+    assert manifest == oras.oci.EmptyManifest
+
+    manifest["layers"].append({"digest": "sha256:abc"})
+    manifest["annotations"]["holiday"] = "Halloween"
+    assert oras.oci.NewManifest() == oras.oci.EmptyManifest
+    assert not oras.oci.EmptyManifest["layers"]
+
+
+def test_layer_validation(tmp_path, monkeypatch):
+    """
+    Layers and configs are validated against the layer schema, if enabled
+    """
+    blob = tmp_path / "blob.txt"
+    blob.write_text("hello world")
+    layer = oras.oci.NewLayer(str(blob))
+    assert layer["size"] == 11
+    assert layer["mediaType"] == oras.defaults.default_blob_media_type
+
+    conf, path = oras.oci.ManifestConfig()
+    assert path is None
+    assert conf["digest"] == oras.defaults.blank_config_hash
+
+    conf, path = oras.oci.ManifestConfig(str(blob))
+    assert path == str(blob)
+    assert conf["size"] == 11
+    assert conf["digest"] == layer["digest"]
+
+    conf, path = oras.oci.ManifestConfig(str(tmp_path / "missing.json"))
+    assert path is None
+    assert conf["size"] == 2
+
+    # Validation is off unless requested
+    conf, _ = oras.oci.ManifestConfig(str(blob), media_type=1)
+    assert conf["mediaType"] == 1
+
+    monkeypatch.setattr(oras.oci, "validate_layers", True)
+    with pytest.raises(jsonschema.ValidationError):
+        oras.oci.ManifestConfig(str(blob), media_type=1)
+
+
+def test_validate_manifest():
+    """
+    Manifests are always validated against the manifest schema
+    """
+    manifest = oras.oci.NewManifest()
+    manifest["config"], _ = oras.oci.ManifestConfig()
+    oras.oci.validate_manifest(manifest)
+
+    del manifest["layers"]
+    with pytest.raises(jsonschema.ValidationError):
+        oras.oci.validate_manifest(manifest)
+
+
+def test_create_subject_from_manifest_bytes():
+    """
+    A subject can be created from raw manifest bytes without re-serializing
+    """
+    manifest = oras.oci.NewManifest()
+    subject = oras.oci.Subject.from_manifest(manifest)
+
+    content = json.dumps(manifest).encode("utf-8")
+    assert oras.oci.serialize_manifest(manifest) == content
+    assert oras.oci.Subject.from_manifest(content) == subject
+
+    # Bytes are hashed as is, so formatting is preserved
+    compact = json.dumps(manifest, separators=(",", ":")).encode("utf-8")
+    other = oras.oci.Subject.from_manifest(compact)
+    assert other.size == len(compact)
+    assert other.digest == oras.oci.content_digest(compact)
+    assert other.digest != subject.digest
+
+
+def test_new_layers(tmp_path):
+    """
+    Creating layers in a batch is the same as creating them one at a time
+    """
+    blobs = []
+    for i in range(5):
+        blob = tmp_path / f"blob-{i}.txt"
+        blob.write_text("hello world " * i)
+        blobs.append(str(blob))
+
+    media_types = [None, "text/plain", None, None, None]
+    is_dirs = [False, False, True, False, False]
+    layers = oras.oci.NewLayers(blobs, media_types=media_types, is_dirs=is_dirs)
+    assert layers == [
+        oras.oci.NewLayer(blob, media_type=media_type, is_dir=is_dir)
+        for blob, media_type, is_dir in zip(blobs, media_types, is_dirs)
+    ]
+    assert layers[1]["mediaType"] == "text/plain"
+    assert layers[2]["mediaType"] == oras.defaults.default_blob_dir_media_type
+
+    assert oras.oci.NewLayers([]) == []
+    with pytest.raises(ValueError):
+        oras.oci.NewLayers(blobs, media_types=["text/plain"])
+
+
+def test_annotations(tmp_path, monkeypatch):
+    """
+    Annotations can be looked up by named section, relative or absolute path
+    """
+    blob = tmp_path / "blob.txt"
+    annotation_file = tmp_path / "annotations.json"
+    annotation_file.write_text(
+        json.dumps(
+            {
+                "$manifest": {"holiday": "Halloween"},
+                str(blob): {"candy": "chocolate"},
+            }
+        )
+    )
+    annotset = oras.oci.Annotations(str(annotation_file))
+    assert annotset.get_annotations("$manifest") == {"holiday": "Halloween"}
+    assert annotset.get_annotations(str(blob)) == {"candy": "chocolate"}
+    assert annotset.get_annotations("$config") == {}
+
+    monkeypatch.chdir(tmp_path)
+    assert annotset.get_annotations("blob.txt") == {"candy": "chocolate"}
+
+    annotset.add("blob2.txt", "candy", "licorice")
+    assert annotset.get_annotations("blob2.txt") == {"candy": "licorice"}
+
+    # Relative paths are only resolved if there are absolute paths to match
+    annotset = oras.oci.Annotations()
+    assert not annotset.has_abspaths
+    annotset.add(str(tmp_path / "blob3.txt"), "candy", "gummies")
+    assert annotset.has_abspaths
+    assert annotset.get_annotations("blob3.txt") == {"candy": "gummies"}
+
+    with pytest.raises(FileNotFoundError):
+        oras.oci.Annotations(str(tmp_path / "nope.json"))
@@ -2,13 +2,21 @@ __author__ = "Vanessa Sochat"
 __copyright__ = "Copyright The ORAS Authors."
 __license__ = "Apache-2.0"
 
+import asyncio
+import io
 import os
 import subprocess
+import threading
+import time
 from pathlib import Path
 
 import pytest
+import requests
+import urllib3
 
+import oras.auth
 import oras.client
+import oras.decorator
 import oras.defaults
 import oras.oci
 import oras.provider
@@ -241,3 +249,595 @@ def test_sanitize_path():
         str(e.value)
         == f"Filename {Path(os.path.join(os.getcwd(), '..', '..')).resolve()} is not in {Path('../').resolve()} directory"
     )
+
+
+def test_retry_rewinds_file_data(tmp_path, monkeypatch):
+    """
+    A file streamed as request data is rewound before a retry
+    """
+    monkeypatch.setattr(oras.decorator.time, "sleep", lambda seconds: None)
+    sent = []
+
+    @oras.decorator.retry(attempts=2)
+    def request(data=None):
+        sent.append(data.read())
+        if len(sent) == 1:
+            raise ValueError("connection reset")
+        return requests.Response()
+
+    blob = tmp_path / "blob.txt"
+    blob.write_bytes(b"blobby")
+    with open(blob, "rb") as fd:
+        request(data=fd)
+    assert sent == [b"blobby", b"blobby"]
+
+
+def test_session_adapter():
+    """
+    The session keeps a tuned connection pool for http and https
+    """
+    remote = oras.provider.Registry(hostname="localhost:5000", insecure=True)
+    for prefix in ["http://", "https://"]:
+        adapter = remote.session.get_adapter(f"{prefix}localhost:5000")
+        assert adapter._pool_maxsize == oras.defaults.default_pool_maxsize
+        assert adapter.max_retries.total == oras.defaults.default_max_retries
+        assert 429 in adapter.max_retries.status_forcelist
+        assert "PATCH" not in adapter.max_retries.allowed_methods
+        assert adapter.max_retries.connect == adapter.max_retries.read == 0
+    assert remote.session.headers["User-Agent"] == "oras-py"
+
+    # The pool keeps a connection for each parallel transfer
+    remote = oras.provider.Registry(hostname="localhost:5000", max_concurrency=100)
+    assert remote.session.get_adapter("https://localhost:5000")._pool_maxsize == 100
+
+
+def test_retry_after_capped():
+    """
+    A registry can't make the client wait longer than max_retry_after
+    """
+    retry = oras.provider.RegistryRetry(total=3, status_forcelist=[429])
+    for value, expected in [("3600", oras.defaults.max_retry_after), ("2", 2)]:
+        response = urllib3.HTTPResponse(status=429, headers={"Retry-After": value})
+        assert retry.get_retry_after(response) == expected
+    assert retry.get_retry_after(urllib3.HTTPResponse(status=429)) is None
+
+
+def test_custom_session():
+    """
+    A session passed to the client is shared with auth and keeps its adapters
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter()
+    session.mount("https://", adapter)
+    remote = oras.provider.Registry(hostname="localhost:5000", session=session)
+    assert remote.session is session
+    assert remote.auth.session is session
+    assert session.get_adapter("https://localhost:5000") is adapter
+
+
+def test_request_headers_not_shared(monkeypatch):
+    """
+    Auth headers are added to a copy of the headers passed to a request
+    """
+    remote = oras.provider.Registry(hostname="localhost:5000", insecure=True)
+    remote.set_header("User-Agent", "oras-test")
+    remote.auth.token = "dinosaur"
+    sent = []
+
+    def request(method, url, headers=None, **kwargs):
+        sent.append(headers)
+        response = requests.Response()
+        response.status_code = 200
+        return response
+
+    monkeypatch.setattr(remote.session, "request", request)
+    remote.do_request("http://localhost:5000/v2/", headers=remote.headers)
+    assert sent[0]["Authorization"] == "Bearer dinosaur"
+    assert sent[0]["User-Agent"] == "oras-test"
+    assert remote.headers == {"User-Agent": "oras-test"}
+
+
+def test_request_json_encoded_once(monkeypatch):
+    """
+    Json data is encoded once, and sent as is when the request is retried
+    """
+    remote = oras.provider.Registry(hostname="localhost:5000", insecure=True)
+    remote.auth = oras.auth.get_auth_backend("basic", remote.session)
+    sent = []
+
+    def request(method, url, data=None, json=None, headers=None, **kwargs):
+        sent.append((data, json, headers))
+        response = requests.Response()
+        response.status_code = 401 if len(sent) == 1 else 200
+        return response
+
+    monkeypatch.setattr(remote.session, "request", request)
+    remote.do_request(
+        "http://localhost:5000/v2/", "POST", json={"holiday": "Halloween"}
+    )
+    assert [data for data, _, _ in sent] == [b'{"holiday": "Halloween"}'] * 2
+    assert [json for _, json, _ in sent] == [None, None]
+    assert all(h["Content-Type"] == "application/json" for _, _, h in sent)
+
+
+def test_get_manifest_accept(monkeypatch):
+    """
+    Allowed manifest media types are sent as a comma separated Accept header
+    """
+    remote = oras.provider.Registry(hostname="localhost:5000", insecure=True)
+    sent = []
+
+    def do_request(url, method="GET", headers=None, **kwargs):
+        sent.append(headers["Accept"])
+        response = requests.Response()
+        response.status_code = 200
+        response._content = oras.oci.serialize_manifest(oras.oci.NewManifest())
+        return response
+
+    monkeypatch.setattr(remote, "do_request", do_request)
+    remote.get_manifest("localhost:5000/dinosaur/artifact:v1")
+    index = "application/vnd.oci.image.index.v1+json"
+    remote.get_manifest(
+        "localhost:5000/dinosaur/artifact:v1",
+        [oras.defaults.default_manifest_media_type, index],
+    )
+    assert sent == [
+        oras.defaults.default_manifest_media_type,
+        f"{oras.defaults.default_manifest_media_type},{index}",
+    ]
+
+
+def test_validate_path(tmp_path, monkeypatch):
+    """
+    Blob paths must be in the present working directory or below
+    """
+    remote = oras.provider.Registry(hostname="localhost:5000", insecure=True)
+    cwd = tmp_path / "code"
+    cwd.mkdir()
+    monkeypatch.chdir(cwd)
+    assert remote._validate_path("artifact.txt")
+    assert remote._validate_path(str(cwd / "data" / "artifact.txt"))
+    assert remote._validate_path("artifact.txt", cwd=str(cwd))
+    assert not remote._validate_path("../artifact.txt")
+
+    # A path that only contains the present working directory is outside it
+    assert not remote._validate_path(str(tmp_path / "other" / str(cwd).lstrip("/")))
+    assert not remote._validate_path(str(cwd) + "-other/artifact.txt")
+
+
+def test_async_push_pull(monkeypatch):
+    """
+    apush and apull run push and pull with the same arguments in an executor
+    """
+    remote = oras.provider.Registry(hostname="localhost:5000", insecure=True)
+    calls = []
+    monkeypatch.setattr(
+        remote, "push", lambda *args, **kwargs: calls.append(("push", args, kwargs))
+    )
+    monkeypatch.setattr(
+        remote, "pull", lambda *args, **kwargs: calls.append(("pull", args, kwargs))
+    )
+
+    async def main():
+        await asyncio.gather(
+            remote.apush("localhost:5000/dinosaur/artifact:v1", files=["a.txt"]),
+            remote.apull(target="localhost:5000/dinosaur/artifact:v1"),
+        )
+
+    asyncio.run(main())
+    assert sorted(calls) == [
+        ("pull", (), {"target": "localhost:5000/dinosaur/artifact:v1"}),
+        ("push", ("localhost:5000/dinosaur/artifact:v1",), {"files": ["a.txt"]}),
+    ]
+
+
+def test_chunked_upload_digest(tmp_path, monkeypatch):
+    """
+    A chunked upload computes a missing digest and checks a given one
+    """
+    remote = oras.provider.Registry(hostname="localhost:5000", insecure=True)
+    container = remote.get_container("localhost:5000/dinosaur/artifact:v1")
+    requests_sent = []
+
+    def do_request(url, method="GET", data=None, headers=None, **kwargs):
+        requests_sent.append((method, url))
+        if hasattr(data, "read"):
+            data.read()
+        response = requests.Response()
+        response.status_code = 201 if method == "PUT" else 202
+        response.headers["Location"] = "/v2/dinosaur/artifact/blobs/uploads/1"
+        return response
+
+    monkeypatch.setattr(remote, "do_request", do_request)
+    blob = tmp_path / "blob.txt"
+    blob.write_bytes(b"blobby" * 10)
+    digest = oras.utils.get_file_hash(str(blob))
+
+    layer = {"size": 60}
+    remote.chunked_upload(str(blob), container, layer, chunk_size=16)
+    assert layer["digest"] == f"sha256:{digest}"
+    assert [method for method, _ in requests_sent] == ["POST"] + ["PATCH"] * 4 + ["PUT"]
+    assert requests_sent[-1][1].endswith(f"digest=sha256%3A{digest}")
+
+    layer = {"size": 60, "digest": "sha256:" + "0" * 64}
+    with pytest.raises(ValueError):
+        remote.chunked_upload(str(blob), container, layer, chunk_size=16)
+
+
+def test_chunked_upload_too_large(tmp_path, monkeypatch):
+    """
+    A chunked upload starts over with smaller chunks after a 413
+    """
+    remote = oras.provider.Registry(hostname="localhost:5000", insecure=True)
+    container = remote.get_container("localhost:5000/dinosaur/artifact:v1")
+    monkeypatch.setattr(oras.defaults, "min_chunksize", 8)
+    patches = []
+    posts = []
+
+    def do_request(url, method="GET", data=None, headers=None, **kwargs):
+        response = requests.Response()
+        response.status_code = 201 if method == "PUT" else 202
+        response.headers["Location"] = "/v2/dinosaur/artifact/blobs/uploads/1"
+        if method == "POST":
+            posts.append(url)
+        if method == "PATCH":
+            patches.append(len(data.read() if hasattr(data, "read") else data))
+            if patches[-1] > 16:
+                response.status_code = 413
+        return response
+
+    monkeypatch.setattr(remote, "do_request", do_request)
+    blob = tmp_path / "blob.txt"
+    blob.write_bytes(b"blobby" * 10)
+    layer = {"digest": f"sha256:{oras.utils.get_file_hash(str(blob))}"}
+    response = remote.chunked_upload(str(blob), container, layer, chunk_size=64)
+    assert response.status_code == 201
+    assert patches == [60, 30, 15, 15, 15, 15]
+
+    # The upload session is kept, and not left behind for a new one
+    assert len(posts) == 1
+
+
+@pytest.mark.parametrize("do_chunked", [False, True])
+def test_upload_blob_mount_refused(tmp_path, monkeypatch, do_chunked):
+    """
+    When a blob can't be mounted, the upload session the registry opened is used
+    """
+    remote = oras.provider.Registry(hostname="localhost:5000", insecure=True)
+    container = remote.get_container("localhost:5000/dinosaur/artifact:v1")
+    requests_sent = []
+
+    def do_request(url, method="GET", data=None, headers=None, **kwargs):
+        requests_sent.append((method, url))
+        if hasattr(data, "read"):
+            data.read()
+        response = requests.Response()
+        response.status_code = {"HEAD": 404, "PUT": 201}.get(method, 202)
+        response.headers["Location"] = "/v2/dinosaur/artifact/blobs/uploads/1"
+        return response
+
+    monkeypatch.setattr(remote, "do_request", do_request)
+    blob = tmp_path / "blob.txt"
+    blob.write_bytes(b"blobby" * 10)
+    layer = {"size": 60, "digest": f"sha256:{oras.utils.get_file_hash(str(blob))}"}
+    response = remote.upload_blob(
+        str(blob),
+        container,
+        layer,
+        do_chunked=do_chunked,
+        chunk_size=32,
+        from_repo="dinosaur/other",
+    )
+    assert response.status_code == 201
+    posts = [url for method, url in requests_sent if method == "POST"]
+    assert len(posts) == 1 and "mount=" in posts[0]
+    assert requests_sent[-1][1].startswith(
+        "http://localhost:5000/v2/dinosaur/artifact/blobs/uploads/1"
+    )
+
+
+@pytest.mark.parametrize("do_chunked", [False, True])
+def test_upload_blob_without_digest(tmp_path, monkeypatch, do_chunked):
+    """
+    A layer without a digest is uploaded, and gets the digest filled in
+    """
+    remote = oras.provider.Registry(hostname="localhost:5000", insecure=True)
+    container = remote.get_container("localhost:5000/dinosaur/artifact:v1")
+    requests_sent = []
+
+    def do_request(url, method="GET", data=None, headers=None, **kwargs):
+        requests_sent.append((method, url))
+        if hasattr(data, "read"):
+            data.read()
+        response = requests.Response()
+        response.status_code = {"HEAD": 404, "PUT": 201}.get(method, 202)
+        response.headers["Location"] = "/v2/dinosaur/artifact/blobs/uploads/1"
+        return response
+
+    monkeypatch.setattr(remote, "do_request", do_request)
+    blob = tmp_path / "blob.txt"
+    blob.write_bytes(b"blobby" * 10)
+    layer = {"size": 60}
+    response = remote.upload_blob(
+        str(blob),
+        container,
+        layer,
+        do_chunked=do_chunked,
+        chunk_size=32,
+        from_repo="dinosaur/other",
+    )
+    assert response.status_code == 201
+    assert layer["digest"] == f"sha256:{oras.utils.get_file_hash(str(blob))}"
+    assert requests_sent[-1][1].endswith(layer["digest"].replace(":", "%3A"))
+
+    # The chunked upload has no digest to check for or mount before sending
+    if do_chunked:
+        assert [m for m, _ in requests_sent] == ["POST", "PATCH", "PATCH", "PUT"]
+
+
+def test_parse_response_errors(monkeypatch):
+    """
+    OCI error messages are logged, and other bodies are ignored
+    """
+    remote = oras.provider.Registry(hostname="localhost:5000", insecure=True)
+    errors = []
+    monkeypatch.setattr(oras.provider.logger, "error", errors.append)
+    for content in [
+        b"",
+        b"<html>Bad Gateway</html>",
+        b'["unknown"]',
+        b'{"errors": null}',
+        b'{"errors": [{"code": "DENIED", "message": "requested access is denied"}]}',
+    ]:
+        response = requests.Response()
+        response.status_code = 403
+        response._content = content
+        remote._parse_response_errors(response)
+    assert errors == ["requested access is denied"]
+
+
+def test_push_max_concurrency(tmp_path, monkeypatch):
+    """
+    A push can upload with fewer (or more) parallel uploads than the client
+    """
+    remote = oras.provider.Registry(hostname="localhost:5000", insecure=True)
+    workers = []
+
+    class Executor(oras.provider.ThreadPoolExecutor):
+        def __init__(self, max_workers=None):
+            workers.append(max_workers)
+            super().__init__(max_workers=max_workers)
+
+    def response(*args, **kwargs):
+        response = requests.Response()
+        response.status_code = 201
+        return response
+
+    monkeypatch.setattr(oras.provider, "ThreadPoolExecutor", Executor)
+    monkeypatch.setattr(remote, "upload_blob", response)
+    monkeypatch.setattr(remote, "upload_manifest", response)
+    monkeypatch.setattr(remote, "blob_exists", lambda *args: True)
+    monkeypatch.chdir(tmp_path)
+    for name in ["a.txt", "b.txt", "c.txt"]:
+        (tmp_path / name).write_text(name)
+
+    target = "localhost:5000/dinosaur/artifact:v1"
+    files = ["a.txt", "b.txt", "c.txt"]
+    remote.push(target=target, files=files)
+    remote.push(target=target, files=files, max_concurrency=2)
+    assert workers == [oras.defaults.default_max_workers, 2]
+
+
+def test_delete_tags(monkeypatch):
+    """
+    Tags are deleted in parallel, and a manifest is only deleted once
+    """
+    remote = oras.provider.Registry(hostname="localhost:5000", insecure=True)
+    manifests = {"t1": "sha256:a", "t2": "sha256:a", "t3": "sha256:b"}
+    lock = threading.Lock()
+
+    def do_request(url, method="GET", headers=None, **kwargs):
+        reference = url.rsplit("/", 1)[-1]
+        response = requests.Response()
+        with lock:
+            if method == "HEAD" and reference in manifests:
+                response.status_code = 200
+                response.headers["Docker-Content-Digest"] = manifests[reference]
+            elif method == "DELETE" and reference in manifests.values():
+                response.status_code = 202
+                for tag in [t for t, d in manifests.items() if d == reference]:
+                    del manifests[tag]
+            else:
+                response.status_code = 404
+        return response
+
+    monkeypatch.setattr(remote, "do_request", do_request)
+    deleted = remote.delete_tags(
+        "localhost:5000/dinosaur/artifact", ["t1", "t2", "t3", "nope"]
+    )
+    assert not manifests
+    assert deleted in [["t1", "t3"], ["t2", "t3"]]
+
+
+@pytest.mark.parametrize("ranges", ["all", "none", "first"])
+def test_download_blob_ranges(tmp_path, monkeypatch, ranges):
+    """
+    Large blobs are downloaded in parallel ranges, if the registry supports them
+    """
+    remote = oras.provider.Registry(
+        hostname="localhost:5000", insecure=True, chunk_size=10
+    )
+    monkeypatch.setattr(oras.defaults, "parallel_download_size", 20)
+    blob = os.urandom(95)
+    sent = []
+
+    def do_request(url, method="GET", headers=None, stream=False, **kwargs):
+        byte_range = (headers or {}).get("Range")
+        sent.append(byte_range)
+        response = requests.Response()
+        response.status_code = 200
+        content = blob
+        first = byte_range and byte_range.startswith("bytes=0-")
+        if ranges == "all" or (ranges == "first" and first):
+            start, end = byte_range.split("=")[1].split("-")
+            response.status_code = 206
+            content = blob[int(start) : int(end) + 1]
+        response.raw = io.BytesIO(content)
+        return response
+
+    monkeypatch.setattr(remote, "do_request", do_request)
+    outfile = str(tmp_path / "blob.bin")
+    remote.download_blob(
+        "localhost:5000/dinosaur/artifact:v1", "sha256:abc", outfile, size=len(blob)
+    )
+    with open(outfile, "rb") as f:
+        assert f.read() == blob
+    if ranges == "all":
+        assert len(sent) == 10
+    elif ranges == "none":
+        assert len(sent) == 1
+
+    # A registry that stops returning ranges gets a single download of the blob
+    else:
+        assert sent[-1] is None and len(sent) <= 11
+
+
+def test_download_blob_ranges_limit(tmp_path, monkeypatch):
+    """
+    Parallel downloads of large blobs share one limit of requests in flight
+    """
+    remote = oras.provider.Registry(
+        hostname="localhost:5000", insecure=True, chunk_size=10, max_concurrency=2
+    )
+    monkeypatch.setattr(oras.defaults, "parallel_download_size", 20)
+    blob = os.urandom(95)
+    lock = threading.Lock()
+    in_flight = [0, 0]
+
+    def do_request(url, method="GET", headers=None, stream=False, **kwargs):
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight[0] -= 1
+        start, end = headers["Range"].split("=")[1].split("-")
+        response = requests.Response()
+        response.status_code = 206
+        response.raw = io.BytesIO(blob[int(start) : int(end) + 1])
+        return response
+
+    monkeypatch.setattr(remote, "do_request", do_request)
+
+    def download(i):
+        outfile = str(tmp_path / f"blob{i}.bin")
+        remote.download_blob(
+            "localhost:5000/dinosaur/artifact:v1", "sha256:abc", outfile, size=95
+        )
+        with open(outfile, "rb") as f:
+            assert f.read() == blob
+
+    threads = [threading.Thread(target=download, args=(i,)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert in_flight[0] == 0 and in_flight[1] <= 2
+
+
+def test_download_blob_ranges_error(tmp_path, monkeypatch):
+    """
+    An error in one range cancels the ranges that are still to be downloaded
+    """
+    remote = oras.provider.Registry(
+        hostname="localhost:5000", insecure=True, chunk_size=10, max_concurrency=2
+    )
+    monkeypatch.setattr(oras.defaults, "parallel_download_size", 20)
+    sent = []
+
+    def do_request(url, method="GET", headers=None, stream=False, **kwargs):
+        sent.append(headers["Range"])
+        response = requests.Response()
+        response.status_code = 206
+
+        # The first range is cut short, while the others take a while
+        if headers["Range"].startswith("bytes=0-"):
+            response.raw = io.BytesIO(b"x" * 5)
+        else:
+            time.sleep(0.05)
+            response.raw = io.BytesIO(b"x" * 10)
+        return response
+
+    monkeypatch.setattr(remote, "do_request", do_request)
+    with pytest.raises(ValueError, match="incomplete range"):
+        remote.download_blob(
+            "localhost:5000/dinosaur/artifact:v1",
+            "sha256:abc",
+            str(tmp_path / "blob.bin"),
+            size=95,
+        )
+    assert len(sent) < 10
+
+
+def test_push_missing_file(tmp_path, monkeypatch):
+    """
+    A file that doesn't exist is reported before anything is uploaded
+    """
+    remote = oras.provider.Registry(hostname="localhost:5000", insecure=True)
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(FileNotFoundError, match="missing.txt does not exist"):
+        remote.push(target="localhost:5000/dinosaur/artifact:v1", files=["missing.txt"])
+
+
+def test_push_manifest_annotations(tmp_path, monkeypatch):
+    """
+    Custom manifest annotations override those from the annotation file
+    """
+    remote = oras.provider.Registry(hostname="localhost:5000", insecure=True)
+    manifests = []
+
+    def upload_manifest(manifest, container):
+        manifests.append(manifest)
+        response = requests.Response()
+        response.status_code = 201
+        return response
+
+    monkeypatch.setattr(remote, "upload_manifest", upload_manifest)
+    monkeypatch.setattr(remote, "blob_exists", lambda *args: True)
+    monkeypatch.chdir(tmp_path)
+    annotation_file = tmp_path / "annotations.json"
+    annotation_file.write_text(
+        '{"$manifest": {"holiday": "Halloween", "treat": "candy"}}'
+    )
+
+    annotations = {"holiday": "Thanksgiving"}
+    remote.push(
+        target="localhost:5000/dinosaur/artifact:v1",
+        annotation_file=str(annotation_file),
+        manifest_annotations=annotations,
+    )
+    assert manifests[0]["annotations"] == {"holiday": "Thanksgiving", "treat": "candy"}
+    assert annotations == {"holiday": "Thanksgiving"}
+
+
+def test_push_missing_empty_config(tmp_path, monkeypatch):
+    """
+    A missing empty config is checked for once, and then uploaded
+    """
+    remote = oras.provider.Registry(hostname="localhost:5000", insecure=True)
+    requests_sent = []
+
+    def do_request(url, method="GET", data=None, headers=None, **kwargs):
+        requests_sent.append((method, url))
+        if hasattr(data, "read"):
+            data.read()
+        response = requests.Response()
+        response.status_code = {"HEAD": 404, "PUT": 201}.get(method, 202)
+        response.headers["Location"] = "/v2/dinosaur/artifact/blobs/uploads/1"
+        return response
+
+    monkeypatch.setattr(remote, "do_request", do_request)
+    monkeypatch.chdir(tmp_path)
+    remote.push(target="localhost:5000/dinosaur/artifact:v1")
+    assert [method for method, _ in requests_sent] == ["HEAD", "POST", "PUT", "PUT"]
+    assert requests_sent[0][1].endswith(oras.defaults.blank_config_hash)
@@ -2,13 +2,18 @@ __author__ = "Vanessa Sochat"
 __copyright__ = "Copyright The ORAS Authors."
 __license__ = "Apache-2.0"
 
+import hashlib
+import importlib.util
+import io
 import json
 import os
 import pathlib
 import shutil
+import sys
 
 import pytest
 
+import oras.defaults
 import oras.utils as utils
 
 
@@ -56,6 +61,24 @@ def test_write_json(tmp_path):
     assert "Wakkawakkawakka" in content
     content = utils.read_json(tmpfile)
     assert "Wakkawakkawakka" in content
+    assert utils.read_json(tmpfile, mode="rb") == content
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_load_json(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(utils.fileio, "orjson", None)
+    content = '{"Wakkawakkawakka": [true, "2", 3]}'
+    assert utils.load_json(content) == {"Wakkawakkawakka": [True, "2", 3]}
+    assert utils.load_json(content.encode("utf-8")) == utils.load_json(content)
+    with pytest.raises(json.JSONDecodeError):
+        utils.load_json("{nope")
+
+
+def test_readline(monkeypatch):
+    monkeypatch.setattr("sys.stdin", io.StringIO("password\nsecond line\n"))
+    assert utils.readline() == "password"
+    assert sys.stdin.read() == "second line\n"
 
 
 def test_copyfile(tmp_path):
@@ -71,6 +94,108 @@ def test_copyfile(tmp_path):
     assert os.path.exists(dest)
 
 
+@pytest.mark.parametrize("use_file_digest", [True, False])
+@pytest.mark.parametrize("use_mmap", [True, False])
+def test_get_file_hash(tmp_path, monkeypatch, use_file_digest, use_mmap):
+    print("Testing utils.get_file_hash, get_size_and_hash")
+    if not use_file_digest:
+        monkeypatch.delattr(hashlib, "file_digest", raising=False)
+    if use_mmap:
+        monkeypatch.setattr(oras.defaults, "mmap_hash_threshold", 1024)
+
+    content = os.urandom(2**20 + 7)
+    tmpfile = str(tmp_path / "blob.bin")
+    with open(tmpfile, "wb") as f:
+        f.write(content)
+
+    expected = hashlib.sha256(content).hexdigest()
+    assert utils.get_file_hash(tmpfile) == expected
+    assert utils.get_size_and_hash(tmpfile) == (len(content), expected)
+    assert utils.get_file_hash(tmpfile, "md5") == hashlib.md5(content).hexdigest()
+    with pytest.raises(AttributeError):
+        utils.get_file_hash(tmpfile, "noodles")
+
+
+def test_get_hasher(monkeypatch):
+    print("Testing utils.get_hasher")
+    assert utils.get_hasher("md5") is hashlib.md5
+    with pytest.raises(AttributeError):
+        utils.get_hasher("noodles")
+
+    # Without an OpenSSL backed sha256, cryptography is used if installed
+    def sha256(*args, **kwargs):
+        return hashlib.new("sha256", *args, **kwargs)
+
+    monkeypatch.setattr(hashlib, "sha256", sha256)
+    utils.get_hasher.cache_clear()
+    try:
+        hasher = utils.get_hasher("sha256")
+        if importlib.util.find_spec("cryptography") is None:
+            assert hasher is sha256
+        else:
+            assert hasher is utils.fileio._CryptographySha256
+        h = hasher()
+        h.update(b"hello")
+        assert h.hexdigest() == hashlib.new("sha256", b"hello").hexdigest()
+    finally:
+        utils.get_hasher.cache_clear()
+
+
+def test_file_slice(tmp_path):
+    print("Testing utils.FileSlice")
+    blob = tmp_path / "blob.bin"
+    blob.write_bytes(b"0123456789")
+    with open(blob, "rb") as fd:
+        chunk = utils.FileSlice(fd, 2, 5)
+        assert len(chunk) == 5
+        assert chunk.read(2) == b"23"
+        assert len(chunk) == 3 and chunk.tell() == 2
+        assert chunk.read() == b"456"
+        assert chunk.read() == b""
+        chunk.seek(0)
+        assert chunk.read(100) == b"23456"
+
+        # A slice at the end of the file is cut short
+        assert utils.FileSlice(fd, 8, 5).read() == b"89"
+
+        # Content read again (e.g., on retry) is only hashed once
+        hasher = hashlib.sha256()
+        chunk = utils.FileSlice(fd, 0, 6, hasher=hasher)
+        assert chunk.read(4) == b"0123"
+        chunk.seek(0)
+        assert chunk.read() == b"012345"
+        utils.FileSlice(fd, 6, 4, hasher=hasher).read()
+        assert hasher.hexdigest() == hashlib.sha256(b"0123456789").hexdigest()
+
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_upload_body_and_file_slices(tmp_path, monkeypatch, use_mmap):
+    print("Testing utils.upload_body, iter_file_slices")
+    if use_mmap:
+        monkeypatch.setattr(oras.defaults, "mmap_upload_threshold", 1024)
+    content = os.urandom(10 * 1024 + 7)
+    blob = tmp_path / "blob.bin"
+    blob.write_bytes(content)
+
+    with open(blob, "rb") as fd:
+        with utils.upload_body(fd) as body:
+            assert bytes(body) == content if use_mmap else body is fd
+
+        hasher = hashlib.sha256()
+        chunks = []
+        for start, chunk in utils.iter_file_slices(fd, 4096, hasher):
+            assert start == sum(len(c) for c in chunks)
+            chunks.append(bytes(chunk) if use_mmap else chunk.read())
+        assert [len(c) for c in chunks] == [4096, 4096, 2055]
+        assert b"".join(chunks) == content
+        assert hasher.hexdigest() == hashlib.sha256(content).hexdigest()
+
+    empty = tmp_path / "empty"
+    empty.write_bytes(b"")
+    with open(empty, "rb") as fd, utils.upload_body(fd) as body:
+        assert body == b""
+
+
 def test_get_tmpdir_tmpfile():
     print("Testing utils.get_tmpdir, get_tmpfile")
 
@@ -1,10 +1,17 @@
 from .fileio import (
+    FileSlice,
     copyfile,
+    dump_json,
     extract_targz,
     get_file_hash,
+    get_hasher,
     get_size,
+    get_size_and_hash,
     get_tmpdir,
     get_tmpfile,
+    iter_file_slices,
+    load_json,
+    lock_file,
     make_targz,
     mkdir_p,
     print_json,
@@ -15,9 +22,11 @@ from .fileio import (
     recursive_find,
     sanitize_path,
     split_path_and_content,
+    upload_body,
     workdir,
     write_file,
     write_json,
+    write_json_atomic,
 )
 from .request import (
     append_url_params,
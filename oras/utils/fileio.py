@@ -3,9 +3,11 @@ __copyright__ = "Copyright The ORAS Authors."
 __license__ = "Apache-2.0"
 
 import errno
+import functools
 import hashlib
 import io
 import json
+import mmap
 import os
 import pathlib
 import re
@@ -15,7 +17,19 @@ import sys
 import tarfile
 import tempfile
 from contextlib import contextmanager
-from typing import Generator, Optional, TextIO, Union
+from typing import Generator, Optional, TextIO, Tuple, Union
+
+import oras.defaults
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # type: ignore
 
 
 class PathAndOptionalContent:
@@ -26,6 +40,139 @@ class PathAndOptionalContent:
         self.content = content
 
 
+class FileSlice:
+    """
+    Read only a slice (offset and length) of an open binary file.
+
+    This can be given to requests as data, so a part of a file is streamed
+    without first reading it into memory. If a hasher is given, it is updated
+    with the content as it is read. Content read again after a seek (e.g., a
+    retry) is only hashed once.
+    """
+
+    def __init__(self, fd: io.BufferedReader, offset: int, length: int, hasher=None):
+        self.fd = fd
+        self.offset = offset
+        self.length = length
+        self.position = 0
+        self.hasher = hasher
+        self.hashed = 0
+
+    def __len__(self) -> int:
+        return self.length - self.position
+
+    def read(self, size: int = -1) -> bytes:
+        remaining = self.length - self.position
+        if size < 0 or size > remaining:
+            size = remaining
+        if not size:
+            return b""
+        self.fd.seek(self.offset + self.position)
+        data = self.fd.read(size)
+        start = self.position
+        self.position += len(data)
+        if self.hasher is not None and self.position > self.hashed:
+            self.hasher.update(memoryview(data)[self.hashed - start :])
+            self.hashed = self.position
+        return data
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, position: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_CUR:
+            position += self.position
+        elif whence == os.SEEK_END:
+            position += self.length
+        self.position = min(max(position, 0), self.length)
+        return self.position
+
+
+@contextmanager
+def upload_body(
+    fd: io.BufferedReader,
+) -> Generator[Union[bytes, memoryview, io.BufferedReader], None, None]:
+    """
+    Get the body to upload an open file with requests.
+
+    A large file is memory mapped, so it is sent without copying it into (or
+    through) Python. Other files are streamed, and an empty file is sent as
+    empty bytes (requests would send an empty file as chunked).
+
+    :param fd: the open binary file
+    :type fd: io.BufferedReader
+    """
+    size = os.fstat(fd.fileno()).st_size
+    if not size:
+        yield b""
+    elif sys.maxsize > 2**32 and size > oras.defaults.mmap_upload_threshold:
+        with mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                yield view
+    else:
+        yield fd
+
+
+def iter_file_slices(
+    fd: io.BufferedReader, chunk_size: int, hasher=None
+) -> Generator[Tuple[int, Union[memoryview, FileSlice]], None, None]:
+    """
+    Yield the offset and a body to upload for each chunk of an open file.
+
+    Chunks of a large file are slices of the memory mapped file, and other
+    chunks are streamed from the file. If a hasher is given, it is updated
+    with each chunk. A chunk should not be used after the next is yielded.
+
+    While a chunk is uploaded, the kernel is asked to read the next one, so
+    reading from disk overlaps with sending over the network.
+
+    :param fd: the open binary file
+    :type fd: io.BufferedReader
+    :param chunk_size: the size of each chunk in bytes
+    :type chunk_size: int
+    """
+    size = os.fstat(fd.fileno()).st_size
+    if sys.maxsize > 2**32 and size > oras.defaults.mmap_upload_threshold:
+        with mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for start in range(0, size, chunk_size):
+                _prefetch(fd, start + chunk_size, chunk_size, size, mapped)
+                with memoryview(mapped)[start : start + chunk_size] as chunk:
+                    if hasher is not None:
+                        hasher.update(chunk)
+                    yield start, chunk
+        return
+
+    for start in range(0, size, chunk_size):
+        _prefetch(fd, start + chunk_size, chunk_size, size)
+        yield start, FileSlice(fd, start, min(chunk_size, size - start), hasher)
+
+
+def _prefetch(
+    fd: io.BufferedReader,
+    start: int,
+    length: int,
+    size: int,
+    mapped: Optional[mmap.mmap] = None,
+):
+    """
+    Ask the kernel to start reading a range of a file that is needed next.
+
+    This is only advice, so it is skipped where it isn't supported.
+    """
+    length = min(length, size - start)
+    if length <= 0:
+        return
+    try:
+        if mapped is not None:
+            if hasattr(mmap, "MADV_WILLNEED"):
+                aligned = start - start % mmap.PAGESIZE
+                mapped.madvise(mmap.MADV_WILLNEED, aligned, length + start - aligned)
+        elif hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd.fileno(), start, length, os.POSIX_FADV_WILLNEED)
+    except (OSError, ValueError):
+        pass
+
+
 def make_targz(source_dir: str, dest_name: Optional[str] = None) -> str:
     """
     Make a targz (compressed) archive from a source directory.
@@ -68,10 +215,9 @@ def workdir(dirname):
 
 def readline() -> str:
     """
-    Read lines from stdin
+    Read a single line from stdin (without reading the rest of the stream)
     """
-    content = sys.stdin.readlines()
-    return content[0].strip()
+    return sys.stdin.readline().strip()
 
 
 def extract_targz(targz: str, outdir: str, numeric_owner: bool = False):
@@ -116,10 +262,93 @@ def get_file_hash(path: str, algorithm: str = "sha256") -> str:
     :param algorithm: the algorithm to use
     :type algorithm: str
     """
-    hasher = getattr(hashlib, algorithm)()
-    with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hasher.update(chunk)
+    with open(path, "rb", buffering=0) as f:
+        return _hash_file(f, algorithm)
+
+
+def get_size_and_hash(path: str, algorithm: str = "sha256") -> Tuple[int, str]:
+    """
+    Return the size and hash of a file, opening it only once.
+    Raises AttributeError if incorrect algorithm supplied.
+
+    :param path: the path to get the size and hash for
+    :type path: str
+    :param algorithm: the algorithm to use
+    :type algorithm: str
+    """
+    with open(path, "rb", buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        return size, _hash_file(f, algorithm)
+
+
+class _CryptographySha256:
+    """
+    Minimal hashlib-like wrapper around the cryptography package SHA256.
+    """
+
+    def __init__(self):
+        from cryptography.hazmat.primitives import hashes
+
+        self._hash = hashes.Hash(hashes.SHA256())
+
+    def update(self, data):
+        self._hash.update(data)
+
+    def hexdigest(self) -> str:
+        return self._hash.finalize().hex()
+
+
+@functools.lru_cache(maxsize=None)
+def get_hasher(algorithm: str = "sha256"):
+    """
+    Get a hash constructor for an algorithm.
+
+    Python builds without OpenSSL fall back to a slower builtin sha256. In that
+    case the (optional) cryptography package is used if it is installed.
+
+    :param algorithm: the name of the hashlib algorithm
+    :type algorithm: str
+    """
+    hasher = getattr(hashlib, algorithm)
+    if algorithm == "sha256" and not hasher.__name__.startswith("openssl_"):
+        try:
+            import cryptography.hazmat.primitives.hashes  # noqa
+
+            return _CryptographySha256
+        except ImportError:
+            pass
+    return hasher
+
+
+def _hash_file(f: io.RawIOBase, algorithm: str = "sha256") -> str:
+    """
+    Hash an open (unbuffered) binary file.
+
+    hashlib.file_digest (Python 3.11+) reads into a reusable buffer and
+    releases the GIL while hashing, so files can be hashed in parallel threads.
+    """
+    hasher = get_hasher(algorithm)
+
+    # Large files are mapped and hashed in one call, letting the kernel read ahead
+    if (
+        sys.maxsize > 2**32
+        and os.fstat(f.fileno()).st_size > oras.defaults.mmap_hash_threshold
+    ):
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mapped, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            hasher = hasher()
+            hasher.update(mapped)
+            return hasher.hexdigest()
+
+    if hasattr(hashlib, "file_digest"):
+        return hashlib.file_digest(f, hasher).hexdigest()  # type: ignore
+
+    hasher = hasher()
+    buffer = bytearray(2**18)
+    view = memoryview(buffer)
+    while size := f.readinto(buffer):  # type: ignore
+        hasher.update(view[:size])
     return hasher.hexdigest()
 
 
@@ -257,9 +486,11 @@ def write_file(
     return filename
 
 
-def read_in_chunks(image: Union[TextIO, io.BufferedReader], chunk_size: int = 1024):
+def read_in_chunks(
+    image: Union[TextIO, io.BufferedReader], chunk_size: int = 1024 * 1024
+):
     """
-    Helper function to read file in chunks, with default size 1k.
+    Helper function to read file in chunks, with default size 1MB.
 
     :param image: file descriptor
     :type image: TextIO or io.BufferedReader
@@ -289,6 +520,63 @@ def write_json(json_obj: dict, filename: str, mode: str = "w") -> str:
     return filename
 
 
+@contextmanager
+def lock_file(path: str) -> Generator[None, None, None]:
+    """
+    Hold an exclusive lock while a file is read, modified and written back.
+
+    Concurrent writers (e.g., logins in a CI matrix) would otherwise lose each
+    other's updates. The lock is taken on the directory of the (resolved) file,
+    so no lock file is left behind. Where fcntl is not available (Windows) no
+    lock is taken.
+
+    :param path: the path of the file to lock
+    :type path: str
+    """
+    if fcntl is None:
+        yield
+        return
+    dirname = os.path.dirname(os.path.realpath(path))
+    fd = os.open(dirname, os.O_RDONLY)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def write_json_atomic(json_obj: dict, filename: str) -> str:
+    """
+    Atomically write json to a filename, so readers never see a partial file.
+
+    A symlink is followed and its target replaced, so the link itself is kept.
+    The mode of an existing file is kept too, and a new file is only readable
+    by the user (it can hold credentials).
+
+    :param json_obj: json object to write
+    :type json_obj: dict
+    :param filename: filename to write
+    :type filename: str
+    """
+    filename = os.path.realpath(filename)
+    fd, tmpfile = tempfile.mkstemp(
+        dir=os.path.dirname(filename), prefix=".tmp-", suffix=".json"
+    )
+    try:
+        with os.fdopen(fd, "w") as filey:
+            filey.write(print_json(json_obj))
+        try:
+            os.chmod(tmpfile, stat.S_IMODE(os.stat(filename).st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(tmpfile, filename)
+    except BaseException:
+        os.remove(tmpfile)
+        raise
+    return filename
+
+
 def print_json(json_obj: dict) -> str:
     """
     Pretty print json.
@@ -319,10 +607,36 @@ def read_json(filename: str, mode: str = "r") -> dict:
 
     :param filename: filename to read
     :type filename: str
-    :param mode: mode to read
+    :param mode: mode to read ("r" or "rb", both are parsed with load_json)
     :type mode: str
     """
-    return json.loads(read_file(filename))
+    with open(filename, mode) as filey:
+        return load_json(filey.read())
+
+
+def load_json(content: Union[str, bytes]) -> dict:
+    """
+    Load json content to a dictionary.
+
+    If orjson is installed it is used for parsing, as it is considerably
+    faster than the standard library for large documents.
+
+    :param content: json content to load
+    :type content: str or bytes
+    """
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def dump_json(json_obj: dict) -> bytes:
+    """
+    Encode json for a request body, the same way requests does for json=
+
+    :param json_obj: json object to encode
+    :type json_obj: dict
+    """
+    return json.dumps(json_obj, allow_nan=False).encode("utf-8")
 
 
 def split_path_and_content(ref: str) -> PathAndOptionalContent: